@@ -0,0 +1,161 @@
+import argparse
+import io
+import json
+import os
+import sys
+import warnings
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from fixturePages import FIXTURES_DIR, SECTIONS
+from CVs import DOCX_FRAGMENTS
+from streamingCV import XML_FRAGMENTS
+from standInServer import StandInServer
+from linkedinParsing import parse_experiences, parse_projects, parse_educations
+from linkedinProfile import LinkedinProfile
+
+PARSERS = {"experience": parse_experiences, "projects": parse_projects, "education": parse_educations}
+
+
+def fixture_slugs() -> list[str]:
+    return sorted(name for name in os.listdir(FIXTURES_DIR) if os.path.isdir(os.path.join(FIXTURES_DIR, name)))
+
+
+def read_fixture(slug: str, page: str) -> str | None:
+    path = os.path.join(FIXTURES_DIR, slug, f"{page}.html")
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as fixture:
+        return fixture.read()
+
+
+def expected_entries(slug: str, section: str) -> int:
+    with open(os.path.join(FIXTURES_DIR, slug, "source.json"), encoding="utf-8") as source:
+        entries = json.load(source)[section]
+    return sum(len(entry.get("roles", [entry])) for entry in entries)
+
+
+def parsed_profile(slug: str) -> LinkedinProfile:
+    profile = LinkedinProfile(slug)
+    for section, parse in PARSERS.items():
+        html = read_fixture(slug, section)
+        if html is not None:
+            for entry in parse(html):
+                {"experience": profile.add_experience, "projects": profile.add_project,
+                 "education": profile.add_education}[section](entry)
+    return profile
+
+
+def benchmark_parse(iterations: int) -> dict:
+    # Throughput of the __get_*__ extractors on every fixture details page
+    results = {}
+    for slug in fixture_slugs():
+        for section in SECTIONS:
+            html = read_fixture(slug, section)
+            if html is None:
+                continue
+            parse = PARSERS[section]
+            entries = len(parse(html))
+            if entries != expected_entries(slug, section):
+                raise AssertionError(f"{slug} {section}: parsed {entries} entries, "
+                                     f"expected {expected_entries(slug, section)}")
+            start = perf_counter()
+            for _ in range(iterations):
+                parse(html)
+            elapsed = (perf_counter() - start) / iterations
+            results[f"{slug}/{section}"] = {"ms_per_page": elapsed * 1000, "pages_per_second": 1 / elapsed,
+                                            "entries": entries, "kilobytes": len(html) / 1024}
+    return results
+
+
+def clear_fragments():
+    DOCX_FRAGMENTS.clear()
+    XML_FRAGMENTS.clear()
+
+
+def benchmark_render(iterations: int) -> dict:
+    # CurriculumVitae construction and save throughput, with the streaming writer alongside. Cold renders every
+    # entry, warm takes every entry from the fragment caches as regenerating an unchanged profile would
+    results = {}
+    for slug in fixture_slugs():
+        profile = parsed_profile(slug)
+        for name, streaming in [("docx", False), ("streaming", True)]:
+            # The first CV builds the shared base document or template
+            profile.create_cv(streaming).save(io.BytesIO())
+            for state in ["cold", "warm"]:
+                construct = 0.0
+                save = 0.0
+                for _ in range(iterations):
+                    if state == "cold":
+                        clear_fragments()
+                    start = perf_counter()
+                    cv = profile.create_cv(streaming)
+                    construct += perf_counter() - start
+                    start = perf_counter()
+                    cv.save(io.BytesIO())
+                    save += perf_counter() - start
+                results[f"{slug}/{name}/{state}"] = {"ms_construct": construct / iterations * 1000,
+                                                     "ms_save": save / iterations * 1000,
+                                                     "cvs_per_second": iterations / (construct + save)}
+    return results
+
+
+def benchmark_scrape(iterations: int, latency: float, parallel_sections: bool) -> dict:
+    # End to end scrape_profile latency against the local stand-in, needs Chrome
+    from selenium.webdriver.chrome.options import Options
+    from selenium.common.exceptions import WebDriverException
+    from linkedinObjects import LinkedinInstance
+
+    options = Options()
+    options.add_argument("--headless=new")
+    results = {}
+    with StandInServer(latency=latency) as server:
+        try:
+            instance = LinkedinInstance(options, parallel_sections=parallel_sections, base_url=server.url)
+        except WebDriverException as e:
+            return {"skipped": f"Chrome is not available: {e.msg}"}
+        try:
+            instance.attempt_login("benchmark", "benchmark")
+            for slug in fixture_slugs():
+                start = perf_counter()
+                for _ in range(iterations):
+                    instance.scrape_profile(LinkedinProfile(slug))
+                results[slug] = {"ms_per_profile": (perf_counter() - start) / iterations * 1000}
+            results["waits"] = {page: sum(waits) / len(waits) * 1000 for page, waits in instance.wait_times.items()}
+        finally:
+            instance.terminate()
+    return results
+
+
+def print_results(name: str, results: dict):
+    print(name)
+    for case, numbers in results.items():
+        if isinstance(numbers, dict):
+            numbers = ", ".join(f"{key} {value:.2f}" if isinstance(value, float) else f"{key} {value}"
+                                for key, value in numbers.items())
+        print(f"  {case:<32} {numbers}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for parsing, rendering and scraping.")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--skip-scrape", action="store_true", help="Do not start Chrome.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stand-in adds to every page.")
+    parser.add_argument("--parallel-sections", action="store_true")
+    parser.add_argument("--json", help="Also write the results to this file, to compare runs.")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    results = {"parse": benchmark_parse(args.iterations), "render": benchmark_render(args.iterations)}
+    if not args.skip_scrape:
+        results["scrape"] = benchmark_scrape(max(1, args.iterations // 10), args.latency, args.parallel_sections)
+    for name, section_results in results.items():
+        print_results(name, section_results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=1)
+
+
+if __name__ == "__main__":
+    main()
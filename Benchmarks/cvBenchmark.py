@@ -0,0 +1,63 @@
+import argparse
+import io
+import os
+import sys
+import warnings
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from CVs import CurriculumVitae, Experience, Education, Project, build_base_document, DOCX_FRAGMENTS
+from streamingCV import StreamingCurriculumVitae, XML_FRAGMENTS
+
+
+def sample_entries(count: int) -> tuple[list[Experience], list[Education], list[Project]]:
+    experiences = [Experience(f"Engineer {i}", "• Built things • Fixed things • Shipped things", f"Company {i}",
+                              "Denver, CO", "Jan 2020", "") for i in range(count)]
+    educations = [Education(f"University {i}", "[LOCATION]", "BS Computer Science", "Robotics, Chess", "",
+                            "2016", "2020") for i in range(max(1, count // 3))]
+    projects = [Project(f"Project {i}", "• Wrote it • Tested it", "2021", "2022") for i in range(count)]
+    return experiences, educations, projects
+
+
+def time_per_cv(create_cv, iterations: int, cold: bool) -> float:
+    # Cold clears the fragment caches before every CV so each entry is rendered, warm reuses them all
+    elapsed = 0.0
+    for _ in range(iterations):
+        if cold:
+            DOCX_FRAGMENTS.clear()
+            XML_FRAGMENTS.clear()
+        start = perf_counter()
+        create_cv()
+        elapsed += perf_counter() - start
+    return elapsed / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per CV cost of the python-docx and streaming renderers.")
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    parser.add_argument("-e", "--entries", type=int, default=5, help="Experiences and projects per CV.")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    experiences, educations, projects = sample_entries(args.entries)
+    cases = {
+        # What every CV paid before the base document was prebuilt
+        "fresh document": lambda: CurriculumVitae("Jane Doe", experiences, educations, projects,
+                                                  document=build_base_document()),
+        "cloned base": lambda: CurriculumVitae("Jane Doe", experiences, educations, projects),
+        "cloned base + save": lambda: CurriculumVitae("Jane Doe", experiences, educations, projects).save(io.BytesIO()),
+        "streaming writer + save": lambda: StreamingCurriculumVitae("Jane Doe", experiences, educations,
+                                                                    projects).save(io.BytesIO()),
+        "fresh document, header only": lambda: CurriculumVitae("Jane Doe", document=build_base_document()),
+        "cloned base, header only": lambda: CurriculumVitae("Jane Doe"),
+    }
+    for name, create_cv in cases.items():
+        create_cv()
+        cold = time_per_cv(create_cv, args.iterations, cold=True)
+        warm = time_per_cv(create_cv, args.iterations, cold=False)
+        print(f"{name:<30} {cold:8.2f} ms/CV cold {warm:8.2f} ms/CV warm")
+
+
+if __name__ == "__main__":
+    main()
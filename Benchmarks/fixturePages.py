@@ -0,0 +1,185 @@
+import json
+import os
+import random
+from html import escape
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SECTIONS = ["experience", "projects", "education"]
+
+
+# Markup modelled on saved LinkedIn pages, every visible line is an aria-hidden span next to a visually-hidden copy
+def __text_span__(text: str) -> str:
+    return (f'<span aria-hidden="true"><!---->{escape(text)}<!----></span>'
+            f'<span class="visually-hidden"><!---->{escape(text)}<!----></span>')
+
+
+def __bold__(text: str) -> str:
+    return f'<div class="display-flex align-items-center mr1 t-bold">{__text_span__(text)}</div>'
+
+
+def __light__(text: str) -> str:
+    return f'<span class="t-14 t-normal t-black--light">{__text_span__(text)}</span>'
+
+
+def __normal__(text: str) -> str:
+    return f'<span class="t-14 t-normal">{__text_span__(text)}</span>'
+
+
+def __description__(text: str) -> str:
+    return (f'<div class="pvs-list__outer-container"><ul class="pvs-list"><li class="pvs-list__item--with-top-padding">'
+            f'<div class="display-flex full-width"><div class="inline-show-more-text inline-show-more-text--is-collapsed">'
+            f'{__text_span__(text)}</div></div></li></ul></div>')
+
+
+def __list_item__(content: str) -> str:
+    return (f'<li class="pvs-list__paged-list-item artdeco-list__item pvs-list__item--line-separated">'
+            f'<div class="pvs-entity pvs-entity--padded"><div class="pvs-entity__image"><a class="optional-action-target-wrapper">'
+            f'<div class="ivm-image-view-model"><img width="48" height="48" alt="" class="ivm-view-attr__img--square" '
+            f'src="data:image/gif;base64,R0lGODlhAQABAAAAACw="></div></a></div>'
+            f'<div class="display-flex flex-column full-width align-self-center">{content}</div></div></li>')
+
+
+def experience_item(experience: dict) -> str:
+    if "roles" not in experience:
+        return __list_item__(
+            __bold__(experience["title"]) +
+            __normal__(f"{experience['company']} · Full-time") +
+            __light__(f"{experience['start']} - {experience['end']} · {experience['duration']}") +
+            __light__(f"{experience['location']} · Hybrid") +
+            __description__(experience["description"]))
+
+    # An employer with several roles lists the roles below it, split by an empty path node
+    roles = ""
+    for role in experience["roles"]:
+        roles += (__bold__(role["title"]) +
+                  __light__(f"{role['start']} - {role['end']} · {role['duration']}") +
+                  __description__(role["description"]) +
+                  '<span class="pvs-entity__path-node"></span>')
+    return __list_item__(
+        __bold__(experience["company"]) +
+        __normal__(f"Full-time · {experience['duration']}") +
+        __light__(f"{experience['location']} · On-site") +
+        roles)
+
+
+def education_item(education: dict) -> str:
+    return __list_item__(
+        __bold__(education["school"]) +
+        __normal__(education["degree"]) +
+        __light__(f"{education['start']} - {education['end']}") +
+        __description__(f"Activities and societies: {education['activities']}") +
+        __description__(education["description"]))
+
+
+def project_item(project: dict) -> str:
+    return __list_item__(
+        __bold__(project["title"]) +
+        __normal__(f"{project['start']} - {project['end']}") +
+        __description__(f"Associated with {project['associated']}") +
+        __description__(project["description"]) +
+        __description__("Skills: Python · Selenium"))
+
+
+def __page__(title: str, main: str, noise: int) -> str:
+    # noise repeats the navigation, ads and footer blocks that make real pages large
+    filler = "".join(f'<div class="scaffold-layout__aside"><section class="artdeco-card pv-browsemap-section">'
+                     f'<ul><li class="pvs-list__item"><span aria-hidden="true">People also viewed {i}</span>'
+                     f'<a class="app-aware-link" href="/in/someone-{i}">Connect</a></li></ul></section></div>'
+                     for i in range(noise))
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>{escape(title)} | LinkedIn</title>'
+            f'<link rel="stylesheet" href="/static/style.css"></head><body class="render-mode-BIGPIPE">'
+            f'<header class="global-nav"><nav><ul><li>Home</li><li>My Network</li><li>Jobs</li></ul></nav></header>'
+            f'<div class="application-outlet"><main class="scaffold-layout__main">{main}</main>{filler}</div>'
+            f'<footer class="global-footer"><p>LinkedIn Corporation</p></footer></body></html>')
+
+
+def details_page(profile: dict, section: str, noise: int = 50) -> str:
+    make_item = {"experience": experience_item, "projects": project_item, "education": education_item}[section]
+    items = "".join(make_item(entry) for entry in profile[section])
+    main = (f'<section class="artdeco-card pb3"><div class="pvs-header__container"><h2 class="pvs-header__title">'
+            f'{section.capitalize()}</h2></div><div class="pvs-list__container"><div class="scaffold-finite-scroll__content">'
+            f'<ul class="pvs-list">{items}</ul></div></div></section>')
+    return __page__(profile["name"], main, noise)
+
+
+def profile_page(profile: dict, noise: int = 50) -> str:
+    main = (f'<section class="artdeco-card pv-top-card"><div class="ph5"><h1 class="text-heading-xlarge">'
+            f'{escape(profile["name"])}</h1><div class="text-body-medium">{escape(profile["headline"])}</div></div></section>'
+            f'<section class="artdeco-card pv-profile-card"><div id="about" class="pv-profile-card__anchor"></div>'
+            f'<div class="pvs-header__container"><span>About</span><span class="visually-hidden">About</span></div>'
+            f'<div class="inline-show-more-text">{__text_span__(profile["about"])}</div></section>')
+    for section in SECTIONS:
+        if len(profile[section]) == 0:
+            continue
+        make_item = {"experience": experience_item, "projects": project_item, "education": education_item}[section]
+        preview = "".join(make_item(entry) for entry in profile[section][:2])
+        main += (f'<section class="artdeco-card pv-profile-card"><div id="{section}" class="pv-profile-card__anchor">'
+                 f'</div><ul class="pvs-list">{preview}</ul><div class="pvs-list__footer-wrapper">'
+                 f'<a href="/details/{section}">Show all {len(profile[section])} {section}</a></div></section>')
+    return __page__(profile["name"], main, noise)
+
+
+def generate_profile(slug: str, experiences: int, projects: int, educations: int, multi_role_every: int = 0,
+                     seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+    def date(year: int) -> str:
+        return f"{rng.choice(months)} {year}"
+
+    def bullets(count: int) -> str:
+        return " ".join(f"• {rng.choice(['Built', 'Led', 'Shipped', 'Designed', 'Maintained'])} "
+                        f"{rng.choice(['the billing service', 'a data pipeline', 'the mobile app', 'CI tooling'])}"
+                        for _ in range(count))
+
+    profile = {"slug": slug, "name": slug.replace("-", " ").title(), "headline": "Software Engineer",
+               "about": "Engineer who likes building reliable systems.", "experience": [], "projects": [],
+               "education": []}
+    for i in range(experiences):
+        year = 2023 - i
+        if multi_role_every and i % multi_role_every == 0:
+            profile["experience"].append({
+                "company": f"Globex {i}", "location": "Austin, Texas", "duration": "4 yrs",
+                "roles": [{"title": f"Senior Engineer {i}", "start": date(year), "end": "Present", "duration": "2 yrs",
+                           "description": bullets(3)},
+                          {"title": f"Engineer {i}", "start": date(year - 2), "end": date(year), "duration": "2 yrs",
+                           "description": bullets(2)}]})
+        else:
+            profile["experience"].append({
+                "title": f"Engineer {i}", "company": f"Acme {i}", "location": "Denver, Colorado",
+                "start": date(year), "end": "Present" if i == 0 else date(year + 1), "duration": "1 yr",
+                "description": bullets(3)})
+    for i in range(projects):
+        profile["projects"].append({"title": f"Project {i}", "start": date(2020), "end": date(2021),
+                                    "associated": "Acme", "description": bullets(2)})
+    for i in range(educations):
+        profile["education"].append({"school": f"University {i}", "degree": "Bachelor of Science, Computer Science",
+                                     "start": "2012", "end": "2016", "activities": "Robotics, Chess",
+                                     "description": "Graduated with honors."})
+    return profile
+
+
+FIXTURE_PROFILES = [
+    generate_profile("jane-doe", experiences=4, projects=2, educations=1, seed=1),
+    generate_profile("multi-role", experiences=6, projects=1, educations=2, multi_role_every=2, seed=2),
+    generate_profile("large-profile", experiences=60, projects=30, educations=3, multi_role_every=5, seed=3),
+]
+
+
+def write_fixtures():
+    for profile in FIXTURE_PROFILES:
+        directory = os.path.join(FIXTURES_DIR, profile["slug"])
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "profile.html"), "w", encoding="utf-8") as page:
+            page.write(profile_page(profile))
+        for section in SECTIONS:
+            if len(profile[section]) == 0:
+                continue
+            with open(os.path.join(directory, f"{section}.html"), "w", encoding="utf-8") as page:
+                page.write(details_page(profile, section))
+        with open(os.path.join(directory, "source.json"), "w", encoding="utf-8") as source:
+            json.dump(profile, source, indent=1)
+
+
+if __name__ == "__main__":
+    write_fixtures()
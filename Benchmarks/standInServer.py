@@ -0,0 +1,109 @@
+import argparse
+import os
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from time import sleep
+from urllib.parse import parse_qs
+
+from fixturePages import FIXTURES_DIR
+
+LOGIN_PAGE = """<!DOCTYPE html><html><head><title>LinkedIn Login</title></head><body>
+<form method="post" action="/checkpoint/lg/login-submit">
+<input id="username" name="session_key" type="text"><input id="password" name="session_password" type="password">
+<button class="btn__primary--large from__button--floating" type="submit">Sign in</button>
+</form></body></html>"""
+FEED_PAGE = "<!DOCTYPE html><html><head><title>Feed | LinkedIn</title></head><body><h1>Feed</h1></body></html>"
+FAILED_LOGIN_PAGE = "<!DOCTYPE html><html><body><p>Wrong email or password.</p></body></html>"
+# Logging in with this password is rejected, to exercise LoginStatus.FAIL
+WRONG_PASSWORD = "wrong"
+SESSION_COOKIE = "li_at=stand-in-session"
+
+PROFILE_PATH = re.compile(r"^/in/(?P<slug>[\w-]+)/?(details/(?P<section>experience|projects|education)/?)?$")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # fixtures_dir and latency are read from the server
+    server_version = "LinkedinStandIn"
+
+    def log_message(self, format, *args):
+        pass
+
+    def __send__(self, status: int, body: str = "", headers: dict = None):
+        sleep(self.server.latency)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/login":
+            return self.__send__(200, LOGIN_PAGE)
+        if path == "/feed/":
+            # Like LinkedIn, the feed sends browsers without a session back to the login page
+            if SESSION_COOKIE not in self.headers.get("Cookie", ""):
+                return self.__send__(303, headers={"Location": "/login"})
+            return self.__send__(200, FEED_PAGE)
+
+        match = PROFILE_PATH.match(path)
+        if match is None:
+            return self.__send__(404, "Not found")
+        page = os.path.join(self.server.fixtures_dir, match.group("slug"),
+                            f"{match.group('section') or 'profile'}.html")
+        if not os.path.isfile(page):
+            return self.__send__(404, "Not found")
+        with open(page, encoding="utf-8") as fixture:
+            self.__send__(200, fixture.read())
+
+    def do_POST(self):
+        if self.path != "/checkpoint/lg/login-submit":
+            return self.__send__(404, "Not found")
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if form.get("session_password", [""])[0] == WRONG_PASSWORD:
+            return self.__send__(200, FAILED_LOGIN_PAGE)
+        self.__send__(303, headers={"Location": "/feed/", "Set-Cookie": f"{SESSION_COOKIE}; Path=/"})
+
+
+class StandInServer:
+    # Serves the recorded fixture pages on localhost under the same paths LinkedinInstance uses on LinkedIn
+    def __init__(self, port: int = 0, latency: float = 0.0, fixtures_dir: str = FIXTURES_DIR):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fixtures_dir = fixtures_dir
+        self.httpd.latency = latency
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self) -> "StandInServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the fixture pages as a local LinkedIn stand-in.")
+    parser.add_argument("-p", "--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    args = parser.parse_args()
+    server = StandInServer(args.port, args.latency)
+    print(f"Serving {FIXTURES_DIR} on {server.url}")
+    server.httpd.serve_forever()
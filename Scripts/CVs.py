@@ -1,10 +1,16 @@
+import copy
 import os.path
+import threading
+from time import perf_counter
 
 import docx.document
 from docx import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_TAB_ALIGNMENT
 from docx.shared import Pt, Inches
 
+from fragmentCache import FragmentCache, fragment_key
+from metrics import METRICS
+
 RIGHT_TAB_INCHES = 7
 BULLET_POINT_STYLE = "ListBullet2"
 
@@ -21,53 +27,155 @@ def set_style_to_defaults(document: docx.document.Document, style_name: str):
     font.size = Pt(10)
 
 
+def build_base_document() -> docx.document.Document:
+    # Everything of a CV that does not depend on the profile: margins, styles and the header layout
+    document = Document()
+
+    # Set the margins
+    section = document.sections[0]
+    section.top_margin = Inches(0.75)
+    section.bottom_margin = Inches(0.75)
+    section.right_margin = Inches(0.75)
+    section.left_margin = Inches(0.75)
+
+    # Set the default styling
+    set_style_to_defaults(document, "Normal")
+    set_style_to_defaults(document, BULLET_POINT_STYLE)
+
+    section.different_first_page_header_footer = True
+    header = section.first_page_header
+    # Clear the existing paragraphs
+    for paragraph in header.paragraphs:
+        element = paragraph._element
+        element.getparent().remove(element)
+
+    # Add the name large at the top, the text is filled in for every CV
+    name_header = header.add_paragraph("[NAME]")
+    name_header.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    name_run = name_header.runs[0]
+    name_run.bold = True
+    name_run.font.size = Pt(28)
+
+    # Add a placeholder for the contact information
+    contact_header = header.add_paragraph("[EMAIL] | [LINKEDIN] | [PHONE #]")
+    contact_header.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    return document
+
+
+__base_document = None
+__base_document_lock = threading.Lock()
+# Parts of the base document that a CV never changes, like the large styles and theme parts
+__shared_parts = []
+# Paragraph elements of every rendered entry, copied into later CVs that show the same entry
+DOCX_FRAGMENTS = FragmentCache("docx")
+
+
+def clone_base_document() -> docx.document.Document:
+    # Build the base document once, copying it is much cheaper than loading the template and styling it again.
+    # Only the body and header are copied, the read only parts are shared between every clone.
+    global __base_document, __shared_parts
+    with __base_document_lock:
+        if __base_document is None:
+            __base_document = build_base_document()
+            changed_parts = {__base_document.part, __base_document.sections[0].first_page_header.part}
+            __shared_parts = [part for part in __base_document.part.package.iter_parts()
+                              if part not in changed_parts]
+    return copy.deepcopy(__base_document, {id(part): part for part in __shared_parts})
+
+
+# Entries are slotted, large scraped populations hold hundreds of thousands of them
 class InformationEntry:
+    __slots__ = ("title", "description", "start_date", "end_date")
+
     def __init__(self, title: str, description: str, start_date, end_date):
         self.title: str = title
         self.description: str = description
         self.start_date = start_date
         self.end_date = end_date
 
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "description": self.description,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+        }
+
 
 class Experience(InformationEntry):
+    __slots__ = ("company_name", "location")
+
     def __init__(self, title: str, description: str, company_name: str, location: str, start_date, end_date):
         super().__init__(title, description, start_date, end_date)
         self.company_name: str = company_name
         self.location: str = location
 
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data["company_name"] = self.company_name
+        data["location"] = self.location
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data["title"], data["description"], data["company_name"], data["location"],
+                   data["start_date"], data["end_date"])
+
 
 class Education(InformationEntry):
+    __slots__ = ("location", "degree", "extracurriculars_text")
+
     def __init__(self, institution: str, location: str, degree: str, extracurriculars: str,
                  description: str, start_date, end_date):
         super().__init__(institution, description, start_date, end_date)
         self.location = location
         self.degree: str = degree
-        self.extracurriculars: list[str] = extracurriculars.split(',')
+        # Kept as the scraped text, the list is only built when asked for
+        self.extracurriculars_text: str = extracurriculars
+
+    @property
+    def extracurriculars(self) -> list[str]:
+        return self.extracurriculars_text.split(',')
+
+    @extracurriculars.setter
+    def extracurriculars(self, extracurriculars: list[str]):
+        self.extracurriculars_text = ",".join(extracurriculars)
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data["location"] = self.location
+        data["degree"] = self.degree
+        data["extracurriculars"] = self.extracurriculars
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data["title"], data["location"], data["degree"], ",".join(data["extracurriculars"]),
+                   data["description"], data["start_date"], data["end_date"])
 
 
 class Project(InformationEntry):
+    __slots__ = ()
+
     def __init__(self, title: str, description: str, start_date, end_date):
         super().__init__(title, description, start_date, end_date)
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data["title"], data["description"], data["start_date"], data["end_date"])
+
 
 class CurriculumVitae:
     def __init__(self, name: str, experiences: list[Experience] = None, educations: list[Education] = None,
-                 projects: list[Project] = None):
+                 projects: list[Project] = None, document: docx.document.Document = None):
         super().__init__()
-        self.document = Document()
+        start = perf_counter()
+        # A document holding the base layout, a clone of the prebuilt one unless one is given
+        self.document = document if document is not None else clone_base_document()
 
-        # Set the margins
         section = self.document.sections[0]
-        section.top_margin = Inches(0.75)
-        section.bottom_margin = Inches(0.75)
-        section.right_margin = Inches(0.75)
-        section.left_margin = Inches(0.75)
-
         self.__right_tab_position = section.page_width - section.right_margin - section.left_margin
-
-        # Set the default styling
-        set_style_to_defaults(self.document, "Normal")
-        set_style_to_defaults(self.document, BULLET_POINT_STYLE)
+        self.__bullet_style = self.document.styles[BULLET_POINT_STYLE]
 
         # Set variables
         self.name = name
@@ -83,6 +191,7 @@ class CurriculumVitae:
         self.__create_projects__()
         self.__add_space__()
         self.__create_experiences__()
+        METRICS.record_time("cv_construct", perf_counter() - start)
 
     def __add_space__(self):
         self.document.add_paragraph()
@@ -93,24 +202,21 @@ class CurriculumVitae:
         heading_run.font.size = Pt(12)
 
     def __create_header__(self):
-        section = self.document.sections[0]
-        section.different_first_page_header_footer = True
-        header = section.first_page_header
-        # Clear the existing paragraphs
-        for paragraph in header.paragraphs:
-            element = paragraph._element
-            element.getparent().remove(element)
-
-        # Add the name large at the top
-        name_header = header.add_paragraph(self.name)
-        name_header.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        name_run = name_header.runs[0]
-        name_run.bold = True
-        name_run.font.size = Pt(28)
-
-        # Add a placeholder for the contact information
-        contact_header = header.add_paragraph("[EMAIL] | [LINKEDIN] | [PHONE #]")
-        contact_header.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        header = self.document.sections[0].first_page_header
+        header.paragraphs[0].runs[0].text = self.name
+
+    def __add_entry__(self, kind: str, entry: InformationEntry, add_entry):
+        # Reuse the paragraphs of an identical entry rendered with the same settings, otherwise render and keep them
+        body = self.document.element.body
+        key = fragment_key(kind, entry, (RIGHT_TAB_INCHES, BULLET_POINT_STYLE, self.__right_tab_position))
+        fragment = DOCX_FRAGMENTS.get(key)
+        if fragment is not None:
+            for element in fragment:
+                body._insert_p(copy.deepcopy(element))
+            return
+        paragraph_count = len(body.p_lst)
+        add_entry(entry)
+        DOCX_FRAGMENTS.put(key, [copy.deepcopy(element) for element in body.p_lst[paragraph_count:]])
 
     def __create_experiences__(self):
         if len(self.experiences) == 0:
@@ -118,34 +224,37 @@ class CurriculumVitae:
         self.__add_section_heading__("WORK EXPERIENCE")
 
         for experience in self.experiences:
-            # Header for the position
-            header_paragraph = self.document.add_paragraph()
-            title_run = header_paragraph.add_run(experience.title.strip())
-            title_run.bold = True
-
-            company_and_location_run = header_paragraph.add_run(
-                f" - {experience.company_name.strip()}, {experience.location.strip()}")
-            company_and_location_run.italic = True
-
-            tab_stops = header_paragraph.paragraph_format.tab_stops
-            tab_stops.add_tab_stop(self.__right_tab_position, WD_TAB_ALIGNMENT.RIGHT)
-
-            date_string = f"{experience.start_date.strip()} – {'Present' if experience.end_date == '' else experience.end_date.strip()}"
-            date_run = header_paragraph.add_run()
-            date_run.add_tab()
-            date_run.add_text(date_string)
-            date_run.italic = True
-
-            # Any description of the position
-            # TODO: Make this format nicer
-            last_para = None
-            for bullet in experience.description.split('•'):
-                bullet.strip()
-                if bullet == '':
-                    continue
-                last_para = self.document.add_paragraph(bullet, style=BULLET_POINT_STYLE)
-            if last_para is not None:
-                last_para.paragraph_format.space_after = Pt(2)
+            self.__add_entry__("experience", experience, self.__add_experience__)
+
+    def __add_experience__(self, experience: Experience):
+        # Header for the position
+        header_paragraph = self.document.add_paragraph()
+        title_run = header_paragraph.add_run(experience.title.strip())
+        title_run.bold = True
+
+        company_and_location_run = header_paragraph.add_run(
+            f" - {experience.company_name.strip()}, {experience.location.strip()}")
+        company_and_location_run.italic = True
+
+        tab_stops = header_paragraph.paragraph_format.tab_stops
+        tab_stops.add_tab_stop(self.__right_tab_position, WD_TAB_ALIGNMENT.RIGHT)
+
+        date_string = f"{experience.start_date.strip()} – {'Present' if experience.end_date == '' else experience.end_date.strip()}"
+        date_run = header_paragraph.add_run()
+        date_run.add_tab()
+        date_run.add_text(date_string)
+        date_run.italic = True
+
+        # Any description of the position
+        # TODO: Make this format nicer
+        last_para = None
+        for bullet in experience.description.split('•'):
+            bullet.strip()
+            if bullet == '':
+                continue
+            last_para = self.document.add_paragraph(bullet, style=self.__bullet_style)
+        if last_para is not None:
+            last_para.paragraph_format.space_after = Pt(2)
 
     def __create_education__(self):
         if len(self.educations) == 0:
@@ -153,35 +262,38 @@ class CurriculumVitae:
         self.__add_section_heading__("EDUCATION")
 
         for education in self.educations:
-            # Header for the position
-            header_paragraph = self.document.add_paragraph()
-            title_run = header_paragraph.add_run(education.title.strip())
-            title_run.bold = True
+            self.__add_entry__("education", education, self.__add_education__)
+
+    def __add_education__(self, education: Education):
+        # Header for the position
+        header_paragraph = self.document.add_paragraph()
+        title_run = header_paragraph.add_run(education.title.strip())
+        title_run.bold = True
 
-            company_and_location_run = header_paragraph.add_run(f" - {education.location.strip()}")
-            company_and_location_run.italic = True
+        company_and_location_run = header_paragraph.add_run(f" - {education.location.strip()}")
+        company_and_location_run.italic = True
 
-            tab_stops = header_paragraph.paragraph_format.tab_stops
-            tab_stops.add_tab_stop(self.__right_tab_position, WD_TAB_ALIGNMENT.RIGHT)
+        tab_stops = header_paragraph.paragraph_format.tab_stops
+        tab_stops.add_tab_stop(self.__right_tab_position, WD_TAB_ALIGNMENT.RIGHT)
 
-            # TODO: Make this format to anticipated if it's not done
-            date_string = f"{education.start_date.strip()} – {education.end_date.strip()}"
-            date_run = header_paragraph.add_run()
-            date_run.add_tab()
-            date_run.add_text(date_string)
-            date_run.italic = True
+        # TODO: Make this format to anticipated if it's not done
+        date_string = f"{education.start_date.strip()} – {education.end_date.strip()}"
+        date_run = header_paragraph.add_run()
+        date_run.add_tab()
+        date_run.add_text(date_string)
+        date_run.italic = True
 
-            # Add the degree / field of study
-            self.document.add_paragraph(f"{education.degree.strip()}")
+        # Add the degree / field of study
+        self.document.add_paragraph(f"{education.degree.strip()}")
 
-            # TODO: Minors
+        # TODO: Minors
 
-            # Extracurriculars
-            if len(education.extracurriculars) > 0:
-                ec_header = self.document.add_paragraph("Extracurriculars")
-                ec_header.runs[0].italic = True
-                for extracurricular in education.extracurriculars:
-                    self.document.add_paragraph(extracurricular.strip(), style=BULLET_POINT_STYLE)
+        # Extracurriculars
+        if len(education.extracurriculars) > 0:
+            ec_header = self.document.add_paragraph("Extracurriculars")
+            ec_header.runs[0].italic = True
+            for extracurricular in education.extracurriculars:
+                self.document.add_paragraph(extracurricular.strip(), style=self.__bullet_style)
 
     def __create_projects__(self):
         if len(self.projects) == 0:
@@ -189,30 +301,34 @@ class CurriculumVitae:
         self.__add_section_heading__("PROJECTS")
 
         for project in self.projects:
-            # Header for the position
-            header_paragraph = self.document.add_paragraph()
-            title_run = header_paragraph.add_run(project.title.strip())
-            title_run.bold = True
-
-            tab_stops = header_paragraph.paragraph_format.tab_stops
-            tab_stops.add_tab_stop(self.__right_tab_position, WD_TAB_ALIGNMENT.RIGHT)
-
-            date_string = f"{project.start_date.strip()} – {'Present' if project.end_date == '' else project.end_date.strip()}"
-            date_run = header_paragraph.add_run()
-            date_run.add_tab()
-            date_run.add_text(date_string)
-            date_run.italic = True
-
-            # Any description of the project
-            # TODO: Make this format nicer
-            last_para = None
-            for bullet in project.description.split('•'):
-                bullet.strip()
-                if bullet == '':
-                    continue
-                last_para = self.document.add_paragraph(bullet, style=BULLET_POINT_STYLE)
-            if last_para is not None:
-                last_para.paragraph_format.space_after = Pt(2)
+            self.__add_entry__("project", project, self.__add_project__)
+
+    def __add_project__(self, project: Project):
+        # Header for the position
+        header_paragraph = self.document.add_paragraph()
+        title_run = header_paragraph.add_run(project.title.strip())
+        title_run.bold = True
+
+        tab_stops = header_paragraph.paragraph_format.tab_stops
+        tab_stops.add_tab_stop(self.__right_tab_position, WD_TAB_ALIGNMENT.RIGHT)
+
+        date_string = f"{project.start_date.strip()} – {'Present' if project.end_date == '' else project.end_date.strip()}"
+        date_run = header_paragraph.add_run()
+        date_run.add_tab()
+        date_run.add_text(date_string)
+        date_run.italic = True
+
+        # Any description of the project
+        # TODO: Make this format nicer
+        last_para = None
+        for bullet in project.description.split('•'):
+            bullet.strip()
+            if bullet == '':
+                continue
+            last_para = self.document.add_paragraph(bullet, style=self.__bullet_style)
+        if last_para is not None:
+            last_para.paragraph_format.space_after = Pt(2)
 
     def save(self, path: str):
-        self.document.save(path)
+        with METRICS.timer("cv_save"):
+            self.document.save(path)
@@ -1,8 +1,12 @@
+import os
 import sys
 from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QApplication, QWidget, QFileDialog, QDialog, QMainWindow, QFormLayout, QLineEdit, QPushButton, QVBoxLayout, QLabel
+from PyQt6.QtWidgets import QApplication, QWidget, QFileDialog, QDialog, QMainWindow, QFormLayout, QLineEdit, QPushButton, QVBoxLayout, QLabel, \
+    QPlainTextEdit, QListWidget, QListWidgetItem
 
-from linkedinObjects import LinkedinInstance, LinkedinProfile, LoginStatus
+from linkedinObjects import LinkedinInstance, LinkedinProfile, LoginStatus, DEFAULT_MAX_DRIVER_MEMORY
+from sessionStore import SessionStore
+from uiWorkers import JobQueue
 
 
 class LoginDialog(QDialog):
@@ -26,7 +30,9 @@ class LoginDialog(QDialog):
         main_layout.addRow(self.login_button)
         main_layout.addRow(self.status_label)
 
-        self.instance = LinkedinInstance()
+        # A session saved by an earlier login is reused, the password is only needed once it expires
+        self.instance = LinkedinInstance(session_store=SessionStore(), max_driver_memory=DEFAULT_MAX_DRIVER_MEMORY)
+        self.awaiting_verification = False
 
         self.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, True)
         self.setLayout(main_layout)
@@ -36,12 +42,17 @@ class LoginDialog(QDialog):
         self.status_label.setText(text)
 
     def __login__(self):
-        login_status = self.instance.attempt_login(self.username_edit.text(), self.password_edit.text())
+        if self.awaiting_verification:
+            login_status = self.instance.confirm_verification()
+        else:
+            login_status = self.instance.attempt_login(self.username_edit.text(), self.password_edit.text())
         if login_status == LoginStatus.SUCCESS:
             self.__set_status_text__("Login successful")
             self.accept()
         elif login_status == LoginStatus.VERIFY:
-            self.__set_status_text__("Login successful. Please complete captcha")
+            self.awaiting_verification = True
+            self.login_button.setText("Continue")
+            self.__set_status_text__("Login successful. Please complete captcha, then press Continue")
         elif login_status == LoginStatus.FAIL:
             self.__set_status_text__("Login failed")
 
@@ -59,25 +70,32 @@ class ScraperDialog(QDialog):
             return
 
         self.linkedin_instance: LinkedinInstance = linkedin_instance
-        self.linkedin_profile: LinkedinProfile = None
+        # Scraping and saving run in the background so the window stays responsive
+        self.job_queue = JobQueue(linkedin_instance)
+        self.linkedin_profiles: dict[str, LinkedinProfile] = {}
+        self.queue_items: dict[str, QListWidgetItem] = {}
+        self.output_dir = ""
         main_layout = QFormLayout()
 
-        self.target_slug_edit = QLineEdit()
-
-        slug_button = QPushButton("Set Slug")
-        slug_button.clicked.connect(self.__set_slug__)
+        self.target_slug_edit = QPlainTextEdit()
+        self.target_slug_edit.setPlaceholderText("One slug or profile url per line")
 
-        self.scrape_button = QPushButton("Scrape Profile")
+        self.scrape_button = QPushButton("Scrape Profiles")
         self.scrape_button.clicked.connect(self.__scrape__)
+        self.output_button = QPushButton("Save CVs To Folder...")
+        self.output_button.clicked.connect(self.__set_output_dir__)
         self.save_button = QPushButton("Generate CV")
         self.save_button.clicked.connect(self.__to_cv__)
 
+        self.queue_list = QListWidget()
+
         self.status_label = QLabel("")
         self.status_label.setTextFormat(Qt.TextFormat.RichText)
 
-        main_layout.addRow('Slug:', self.target_slug_edit)
-        main_layout.addRow(slug_button)
+        main_layout.addRow('Slugs:', self.target_slug_edit)
         main_layout.addRow(self.scrape_button)
+        main_layout.addRow(self.output_button)
+        main_layout.addRow('Queue:', self.queue_list)
         main_layout.addRow(self.save_button)
         main_layout.addRow(self.status_label)
 
@@ -88,20 +106,63 @@ class ScraperDialog(QDialog):
     def __set_status_text__(self, text: str):
         self.status_label.setText(text)
 
-    def __set_slug__(self):
-        self.linkedin_profile = LinkedinProfile(self.target_slug_edit.text())
+    def __set_item_text__(self, slug: str, text: str):
+        if slug in self.queue_items:
+            self.queue_items[slug].setText(f"{slug}: {text}")
 
     def __scrape__(self):
-        if self.linkedin_profile is None:
-            self.__set_status_text__('<a style="color:red;">Please set a profile slug "https://linkedin.com/in/<u>johndoe</u>"</a>')
+        slugs = [line.strip().rstrip('/').split('/in/')[-1] for line in self.target_slug_edit.toPlainText().splitlines()]
+        slugs = [slug for slug in slugs if slug and slug not in self.queue_items]
+        if len(slugs) == 0:
+            self.__set_status_text__('<a style="color:red;">Please enter a profile slug "https://linkedin.com/in/<u>johndoe</u>"</a>')
+            return
+        for slug in slugs:
+            self.queue_items[slug] = QListWidgetItem()
+            self.queue_items[slug].setData(Qt.ItemDataRole.UserRole, slug)
+            self.queue_list.addItem(self.queue_items[slug])
+            self.__set_item_text__(slug, "queued")
+            self.job_queue.scrape(slug, self.__scrape_progress__, self.__scrape_finished__, self.__scrape_failed__)
+        self.target_slug_edit.clear()
+        self.__set_status_text__(f'<a style="color:green;">Queued {len(slugs)} profiles</a>')
+
+    def __scrape_progress__(self, slug: str, step: str):
+        self.__set_item_text__(slug, f"scraping ({step})")
+
+    def __scrape_finished__(self, slug: str, profile: LinkedinProfile):
+        self.linkedin_profiles[slug] = profile
+        self.__set_item_text__(slug, "scraped")
+        if self.output_dir:
+            self.__render__(profile, os.path.join(self.output_dir, f"{slug}.docx"))
+
+    def __scrape_failed__(self, slug: str, reason: str):
+        self.__set_item_text__(slug, f"failed ({reason})")
+        # The failed row stays in the list, the slug can be queued again as a new one
+        self.queue_items.pop(slug, None)
+
+    def __render_failed__(self, slug: str, reason: str):
+        # The profile is still scraped, only this CV was not saved
+        self.__set_item_text__(slug, f"saving failed ({reason})")
+
+    def __render__(self, profile: LinkedinProfile, save_path: str):
+        self.__set_item_text__(profile.slug, "generating CV")
+        self.job_queue.render(profile, save_path,
+                              lambda slug, path: self.__set_item_text__(slug, f"saved {path}"), self.__render_failed__)
+
+    def __set_output_dir__(self):
+        output_dir = QFileDialog.getExistingDirectory(self, caption="Save CVs To")
+        if not output_dir:
             return
-        self.linkedin_instance.scrape_profile(self.linkedin_profile)
-        self.__set_status_text__(
-            '<a style="color:green;">Successfully scraped profile</a>')
+        # Every profile scraped from now on, and every one already scraped, gets its CV written here
+        self.output_dir = output_dir
+        for slug, profile in self.linkedin_profiles.items():
+            self.__render__(profile, os.path.join(self.output_dir, f"{slug}.docx"))
+        self.__set_status_text__(f'<a style="color:green;">Saving CVs to {output_dir}</a>')
 
     def __to_cv__(self):
-        if self.linkedin_profile is None:
-            self.__set_status_text__('<a style="color:red;">Please set a profile slug "https://linkedin.com/in/<u>johndoe</u>"</a>')
+        selected = self.queue_list.currentItem()
+        slug = selected.data(Qt.ItemDataRole.UserRole) if selected is not None else None
+        if slug not in self.linkedin_profiles:
+            self.__set_status_text__('<a style="color:red;">Please select a scraped profile</a>')
             return
 
         # Open a file dialog to ask for a save path
@@ -113,13 +174,14 @@ class ScraperDialog(QDialog):
 
         # The save_path will be an empty string if the user cancels the dialog
         if save_path:
-            self.linkedin_profile.create_cv().save(save_path)
-            self.__set_status_text__('<a style="color:Green;">Successfully generated CV</a>')
+            self.__render__(self.linkedin_profiles[slug], save_path)
+            self.__set_status_text__('<a style="color:Green;">Generating CV</a>')
         else:
             self.__set_status_text__('<a style="color:red;">Invalid save path</a>')
 
     def closeEvent(self, a0):
         if self.linkedin_instance is not None:
+            self.job_queue.shutdown()
             self.linkedin_instance.terminate()
         super().closeEvent(a0)
 
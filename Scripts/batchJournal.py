@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+from time import time
+
+from linkedinProfile import LinkedinProfile, SECTION_ENTRIES
+
+
+class BatchJournal:
+    # Append-only record of a batch, one JSON line per event, replayed on open so a restarted batch carries on
+    def __init__(self, path: str):
+        self.path = path
+        # Profiles finished in any earlier run, as dicts
+        self.completed: dict[str, dict] = {}
+        self.failed: dict[str, str] = {}
+        # Started but neither completed nor failed, the run died while scraping them
+        self.in_flight: set[str] = set()
+        # Sections finished for profiles that are not completed yet, by slug then section
+        self.sections: dict[str, dict[str, dict]] = {}
+        self.__lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.__replay__()
+        self.__file = open(path, "a", encoding="utf-8")
+
+    def __replay__(self):
+        try:
+            journal_file = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line is cut short when the process died mid write
+                    continue
+                self.__apply__(record)
+
+    def __apply__(self, record: dict):
+        slug = record["slug"]
+        event = record["event"]
+        if event == "started":
+            self.in_flight.add(slug)
+            self.failed.pop(slug, None)
+        elif event == "section":
+            self.sections.setdefault(slug, {})[record["section"]] = {"fingerprint": record["fingerprint"],
+                                                                     "entries": record["entries"]}
+        elif event == "completed":
+            self.completed[slug] = record["profile"]
+            self.in_flight.discard(slug)
+            self.failed.pop(slug, None)
+            self.sections.pop(slug, None)
+        elif event == "failed":
+            self.failed[slug] = record["reason"]
+            self.in_flight.discard(slug)
+
+    def __write__(self, record: dict):
+        record["at"] = time()
+        with self.__lock:
+            self.__apply__(record)
+            self.__file.write(json.dumps(record) + "\n")
+            # Flushed every time, the journal is only worth anything if it survives the crash
+            self.__file.flush()
+
+    def started(self, slug: str):
+        self.__write__({"event": "started", "slug": slug})
+
+    def section(self, profile: LinkedinProfile, section: str):
+        entries = [entry.to_dict() for entry in getattr(profile, SECTION_ENTRIES[section])]
+        self.__write__({"event": "section", "slug": profile.slug, "section": section,
+                        "fingerprint": profile.section_fingerprints.get(section), "entries": entries})
+
+    def completed_profile(self, profile: LinkedinProfile):
+        self.__write__({"event": "completed", "slug": profile.slug, "profile": profile.to_dict()})
+
+    def failed_profile(self, slug: str, reason: str):
+        self.__write__({"event": "failed", "slug": slug, "reason": reason})
+
+    def is_completed(self, slug: str) -> bool:
+        return slug in self.completed
+
+    def get_completed(self, slug: str) -> LinkedinProfile:
+        return LinkedinProfile.from_dict(self.completed[slug])
+
+    def partial_profile(self, slug: str) -> LinkedinProfile | None:
+        # The sections an interrupted scrape finished, given to scrape_profile so only the rest is loaded again
+        sections = self.sections.get(slug)
+        if not sections:
+            return None
+        data = {"slug": slug, "section_fingerprints": {}}
+        for section, result in sections.items():
+            if result["fingerprint"] is None:
+                continue
+            data["section_fingerprints"][section] = result["fingerprint"]
+            data[SECTION_ENTRIES[section]] = result["entries"]
+        return LinkedinProfile.from_dict(data)
+
+    def close(self):
+        with self.__lock:
+            self.__file.close()
@@ -0,0 +1,295 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from time import perf_counter
+
+from leanLoading import LoadStats
+from batchJournal import BatchJournal
+from httpFetcher import HttpFetcher
+from linkedinObjects import LinkedinInstance, LinkedinProfile, LoginStatus, DriverRecycleFailed, LINKEDIN_URL
+from processMemory import format_bytes
+from scrapeScheduler import ScrapeScheduler, AccountLimiter, NORMAL
+
+
+class WorkerStats:
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.login_status: LoginStatus | None = None
+        # Logged in by restoring a saved session instead of submitting the password
+        self.session_restored = False
+        self.completed = 0
+        # Profiles that came back as a checkpoint or an empty page
+        self.throttled = 0
+        self.failures: dict[str, str] = {}
+        self.elapsed = 0.0
+        # Detail pages skipped because the section was unchanged since the cached copy
+        self.skipped_sections: dict[str, int] = {}
+        self.time_saved = 0.0
+        # Requests and bytes of the scraped profiles, only counted with lean loading
+        self.load_stats: LoadStats | None = None
+        # Times the driver was replaced to keep its memory in check, and the most it used
+        self.recycles = 0
+        self.peak_driver_memory = 0
+
+    def profiles_per_minute(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return self.completed / self.elapsed * 60
+
+    def summary(self) -> str:
+        summary = (f"Worker {self.worker_id}: {self.completed} scraped, {len(self.failures)} failed, "
+                   f"{self.profiles_per_minute():.1f} profiles/min")
+        if self.throttled > 0:
+            summary += f", throttled {self.throttled} times"
+        if self.session_restored:
+            summary += ", restored saved session"
+        if len(self.skipped_sections) > 0:
+            skipped = ", ".join(f"{count} {section}" for section, count in self.skipped_sections.items())
+            summary += f", skipped unchanged sections: {skipped} (~{self.time_saved:.0f}s saved)"
+        if self.load_stats is not None and self.completed > 0:
+            summary += (f", per profile: {self.load_stats.bytes_received / self.completed / 1_000_000:.2f} MB "
+                        f"received, {self.load_stats.blocked_requests / self.completed:.0f} requests blocked "
+                        f"(~{self.load_stats.estimated_bytes_saved() / self.completed / 1_000_000:.2f} MB saved)")
+        if self.peak_driver_memory > 0:
+            summary += f", peak driver memory {format_bytes(self.peak_driver_memory)}"
+        if self.recycles > 0:
+            summary += f", recycled the driver {self.recycles} times"
+        return summary
+
+
+class BatchResult:
+    def __init__(self):
+        # Keyed by slug in the order the slugs were given
+        self.profiles: dict[str, LinkedinProfile] = {}
+        self.failures: dict[str, str] = {}
+        self.worker_stats: list[WorkerStats] = []
+        # Profiles served from the cache without a browser
+        self.cached = 0
+        # Profiles downloaded over plain HTTP without a browser
+        self.fetched = 0
+        # Profiles finished by an earlier run of the same journal
+        self.resumed = 0
+        self.elapsed = 0.0
+        self.scheduler: ScrapeScheduler | None = None
+
+    def profiles_per_minute(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return len(self.profiles) / self.elapsed * 60
+
+    def browserless_share(self) -> float:
+        if len(self.profiles) == 0:
+            return 0.0
+        return (self.resumed + self.cached + self.fetched) / len(self.profiles)
+
+    def summary(self) -> str:
+        lines = [stats.summary() for stats in self.worker_stats]
+        if self.scheduler is not None:
+            lines.append(self.scheduler.summary())
+        lines.append(f"Total: {len(self.profiles)} profiles ({self.resumed} from the journal, "
+                     f"{self.cached} from cache, {self.fetched} over HTTP, "
+                     f"{self.browserless_share():.0%} without a browser), "
+                     f"{len(self.failures)} failed in {self.elapsed:.1f}s "
+                     f"({self.profiles_per_minute():.1f} profiles/min)")
+        return "\n".join(lines)
+
+
+def __deliver__(slug: str, profile: LinkedinProfile, on_profile, results: dict, failures: dict,
+                results_lock: threading.Lock = None) -> bool:
+    # A profile is only a result once on_profile has taken it, when the callback fails it is a failure and nothing else
+    if on_profile is not None:
+        try:
+            on_profile(profile)
+        except Exception as e:
+            failures[slug] = str(e)
+            return False
+    with results_lock or nullcontext():
+        results[slug] = profile
+    return True
+
+
+def __scrape_worker__(stats: WorkerStats, scheduler: ScrapeScheduler, results: dict, results_lock: threading.Lock,
+                      user_id: str, user_pass: str, instance_options: dict, on_profile, journal: BatchJournal = None):
+    start = perf_counter()
+    instance = None
+    try:
+        instance = LinkedinInstance(**instance_options)
+        stats.login_status = instance.attempt_login(user_id, user_pass)
+        stats.session_restored = instance.session_restored
+        if stats.login_status != LoginStatus.SUCCESS:
+            print(f"Worker {stats.worker_id} could not login ({stats.login_status.name}), leaving its slugs to others.")
+            return
+
+        if journal is not None:
+            instance.on_section = journal.section
+        while True:
+            slug = scheduler.next()
+            if slug is None:
+                break
+            profile = LinkedinProfile(slug)
+            previous = None
+            if journal is not None:
+                # Sections an interrupted run already finished are not loaded again
+                journal.started(slug)
+                previous = journal.partial_profile(slug)
+            try:
+                instance.scrape_profile(profile, previous)
+            except DriverRecycleFailed as e:
+                # The worker has no logged in browser any more, its slug goes back to the others
+                print(f"Worker {stats.worker_id} stopped: {e}")
+                scheduler.submit(slug, scheduler.priorities.get(slug, NORMAL))
+                break
+            except Exception as e:
+                # A single bad profile should never stop the batch
+                stats.failures[slug] = str(e)
+                if journal is not None:
+                    journal.failed_profile(slug, str(e))
+                continue
+            if not profile.name and instance.is_not_found():
+                stats.failures[slug] = "Profile not found"
+                if journal is not None:
+                    journal.failed_profile(slug, stats.failures[slug])
+                continue
+            if instance.is_throttled(profile):
+                stats.throttled += 1
+                if not scheduler.report_throttled(slug):
+                    stats.failures[slug] = "Throttled by LinkedIn on every attempt"
+                    if journal is not None:
+                        journal.failed_profile(slug, stats.failures[slug])
+                continue
+            scheduler.report_success(slug)
+            if journal is not None:
+                journal.completed_profile(profile)
+            if __deliver__(slug, profile, on_profile, results, stats.failures, results_lock):
+                stats.completed += 1
+    except Exception as e:
+        print(f"Worker {stats.worker_id} stopped: {e}")
+    finally:
+        stats.elapsed = perf_counter() - start
+        if instance is not None:
+            stats.skipped_sections = dict(instance.skipped_sections)
+            stats.time_saved = instance.estimated_time_saved()
+            stats.recycles = instance.recycles
+            stats.peak_driver_memory = instance.peak_driver_memory
+            if instance.lean_loading:
+                stats.load_stats = instance.load_stats
+            instance.terminate()
+
+
+def __get_http_fetcher__(user_id: str, user_pass: str, http_workers: int, profile_cache,
+                         instance_options: dict) -> HttpFetcher | None:
+    # Plain HTTP requests reuse the cookies of a saved browser session
+    session_store = instance_options.get("session_store")
+    if session_store is None:
+        print("HTTP fetching needs a session store, every profile is loaded in a browser.")
+        return None
+    session = session_store.load(user_id)
+    if session is None:
+        # Log in once so there is a session to borrow
+        instance = LinkedinInstance(**instance_options)
+        try:
+            login_status = instance.attempt_login(user_id, user_pass)
+        finally:
+            instance.terminate()
+        session = session_store.load(user_id)
+        if login_status != LoginStatus.SUCCESS or session is None:
+            print(f"Could not get a session for HTTP fetching ({login_status.name}).")
+            return None
+    return HttpFetcher(session.cookies, base_url=instance_options.get("base_url", LINKEDIN_URL),
+                       pool_size=http_workers, profile_cache=profile_cache,
+                       page_archive=instance_options.get("page_archive"))
+
+
+def scrape_batch(slugs: list[str], user_id: str, user_pass: str, num_workers: int = 2, on_profile=None,
+                 profile_cache=None, http_workers: int = 0, profiles_per_hour: float = None,
+                 priorities: dict[str, int] = None, journal: BatchJournal = None,
+                 **instance_options) -> BatchResult:
+    # Each worker logs in with its own LinkedinInstance, built from instance_options, and pulls slugs from a
+    # scheduler shared by the account, lowest priority number first, at most profiles_per_hour.
+    # Pages load lean unless lean_loading=False is passed. With a journal, profiles it has as completed are not
+    # scraped again and interrupted ones only load the sections they were missing
+    slugs = list(dict.fromkeys(slug.strip() for slug in slugs if slug.strip() != ""))
+    batch_result = BatchResult()
+    results: dict[str, LinkedinProfile] = {}
+    results_lock = threading.Lock()
+    start = perf_counter()
+
+    # Fresh cached profiles never need a browser
+    scheduler = ScrapeScheduler(AccountLimiter(profiles_per_hour))
+    batch_result.scheduler = scheduler
+    priorities = priorities or {}
+    for slug in slugs:
+        if journal is not None and journal.is_completed(slug):
+            if __deliver__(slug, journal.get_completed(slug), on_profile, results, batch_result.failures):
+                batch_result.resumed += 1
+            continue
+        cached_profile = profile_cache.get(slug) if profile_cache is not None else None
+        if cached_profile is None:
+            scheduler.submit(slug, priorities.get(slug, NORMAL))
+            continue
+        if __deliver__(slug, cached_profile, on_profile, results, batch_result.failures):
+            batch_result.cached += 1
+
+    instance_options["profile_cache"] = profile_cache
+    instance_options.setdefault("lean_loading", True)
+
+    # With http_workers, profiles are downloaded without a browser first and only the ones that need
+    # JavaScript are left for the browser workers
+    fetcher = None
+    if http_workers > 0 and scheduler.depth() > 0:
+        fetcher = __get_http_fetcher__(user_id, user_pass, http_workers, profile_cache, instance_options)
+    if fetcher is not None:
+        fetcher.on_throttled = scheduler.limiter.on_throttled
+        pending = scheduler.drain()
+
+        def fetch(slug: str) -> LinkedinProfile | None:
+            # The account's rate limit covers plain requests as much as the browser
+            scheduler.limiter.acquire()
+            profile = LinkedinProfile(slug)
+            if not fetcher.scrape_profile(profile):
+                return None
+            if journal is not None:
+                journal.completed_profile(profile)
+            return profile
+
+        with ThreadPoolExecutor(max_workers=http_workers) as executor:
+            for slug, profile in zip(pending, executor.map(fetch, pending)):
+                if profile is None:
+                    scheduler.submit(slug, priorities.get(slug, NORMAL))
+                    continue
+                if __deliver__(slug, profile, on_profile, results, batch_result.failures):
+                    batch_result.fetched += 1
+        fetcher.close()
+    threads = []
+    for worker_id in range(min(num_workers, scheduler.depth())):
+        stats = WorkerStats(worker_id)
+        batch_result.worker_stats.append(stats)
+        thread = threading.Thread(target=__scrape_worker__, daemon=True,
+                                  args=(stats, scheduler, results, results_lock, user_id, user_pass,
+                                        instance_options, on_profile, journal))
+        threads.append(thread)
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batch_result.elapsed = perf_counter() - start
+
+    for stats in batch_result.worker_stats:
+        batch_result.failures.update(stats.failures)
+    for slug in slugs:
+        if slug in results:
+            batch_result.profiles[slug] = results[slug]
+        elif slug not in batch_result.failures:
+            batch_result.failures[slug] = "Not scraped, no logged in worker was available"
+    return batch_result
+
+
+def read_slugs(path: str) -> list[str]:
+    # One slug or profile url per line, blank lines and # comments are ignored
+    slugs = []
+    with open(path, encoding="utf-8") as slug_file:
+        for line in slug_file:
+            line = line.split('#')[0].strip()
+            if line == "":
+                continue
+            slugs.append(line.rstrip('/').split('/in/')[-1])
+    return slugs
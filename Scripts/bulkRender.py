@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from time import perf_counter
+
+from linkedinProfile import LinkedinProfile
+from processMemory import peak_rss_bytes, format_bytes
+
+
+class RenderStats:
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.rendered = 0
+        self.failures: dict[str, str] = {}
+        self.elapsed = 0.0
+        self.peak_in_flight = 0
+        self.peak_rss_parent = 0
+        self.peak_rss_worker = 0
+
+    def cvs_per_second(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return self.rendered / self.elapsed
+
+    def summary(self) -> str:
+        return (f"Rendered {self.rendered} CVs ({len(self.failures)} failed) with {self.processes} processes in "
+                f"{self.elapsed:.1f}s, {self.cvs_per_second():.1f} CVs/s. Peak RSS: parent "
+                f"{format_bytes(self.peak_rss_parent)}, worker {format_bytes(self.peak_rss_worker)}")
+
+
+def __warm_worker__(streaming: bool):
+    # Build the base document (or streaming template) once per process instead of with the first CV
+    if streaming:
+        from streamingCV import get_template
+        get_template()
+    else:
+        from CVs import clone_base_document
+        clone_base_document()
+
+
+def __render_profile__(profile_data: dict, path: str, streaming: bool) -> int:
+    LinkedinProfile.from_dict(profile_data).create_cv(streaming).save(path)
+    return peak_rss_bytes()
+
+
+def render_bulk(profiles, output_dir: str, processes: int = None, max_in_flight: int = None,
+                streaming: bool = False) -> RenderStats:
+    # profiles may be any iterable, it is only consumed as fast as CVs finish so memory stays flat
+    processes = processes or os.cpu_count() or 1
+    max_in_flight = max_in_flight or processes * 2
+    os.makedirs(output_dir, exist_ok=True)
+    stats = RenderStats(processes)
+
+    start = perf_counter()
+    with ProcessPoolExecutor(processes, initializer=__warm_worker__, initargs=(streaming,)) as executor:
+        in_flight = {}
+
+        def collect(done):
+            for future in done:
+                slug = in_flight.pop(future)
+                try:
+                    stats.peak_rss_worker = max(stats.peak_rss_worker, future.result())
+                    stats.rendered += 1
+                except Exception as e:
+                    stats.failures[slug] = str(e)
+
+        for profile in profiles:
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            path = os.path.join(output_dir, f"{profile.slug}.docx")
+            in_flight[executor.submit(__render_profile__, profile.to_dict(), path, streaming)] = profile.slug
+            stats.peak_in_flight = max(stats.peak_in_flight, len(in_flight))
+        collect(wait(in_flight).done)
+    stats.elapsed = perf_counter() - start
+    stats.peak_rss_parent = peak_rss_bytes()
+    return stats
@@ -0,0 +1,415 @@
+import argparse
+import os
+import sqlite3
+import sys
+from contextlib import nullcontext
+from getpass import getpass
+
+from processMemory import DEFAULT_MAX_DRIVER_MEMORY_MB
+
+# Selenium, python-docx and lxml are slow to import, so every command imports only what it needs
+DEFAULT_CACHE_TTL_HOURS = 7 * 24
+# Per account, well below the pace that gets accounts checkpointed
+DEFAULT_PROFILES_PER_HOUR = 200
+
+
+def __get_credentials__(args) -> tuple[str, str]:
+    user_id = args.username or os.environ.get("LINKEDIN_USERNAME") or input("Username: ")
+    user_pass = os.environ.get("LINKEDIN_PASSWORD") or getpass("Password: ")
+    return user_id, user_pass
+
+
+def __get_cache__(args):
+    if not args.cache_dir:
+        return None
+    from profileCache import ProfileCache
+    return ProfileCache(args.cache_dir, ttl_seconds=args.cache_ttl * 60 * 60, max_entries=args.cache_size)
+
+
+def __get_session_store__(args):
+    if args.no_session:
+        return None
+    from sessionStore import SessionStore, DEFAULT_SESSION_DIR
+    return SessionStore(args.session_dir or DEFAULT_SESSION_DIR)
+
+
+def __get_index__(args):
+    if not getattr(args, "index", None):
+        return None
+    from profileIndex import ProfileIndex
+    return ProfileIndex(args.index)
+
+
+def __get_archive__(args):
+    if not getattr(args, "archive", None):
+        return None
+    from pageArchive import PageArchive
+    return PageArchive(args.archive)
+
+
+def __search_index__(args, index) -> list[str] | None:
+    # Slugs matching every search option given, None when none was given
+    searches = []
+    if args.company:
+        searches.append(index.worked_at(args.company))
+    if args.school:
+        searches.append(index.studied_at(args.school))
+    if args.title:
+        searches.append(index.with_title(args.title))
+    if args.query:
+        searches.append(index.search(args.query))
+    if len(searches) == 0:
+        return None
+    matches = set.intersection(*[set(slugs) for slugs in searches[1:]]) if len(searches) > 1 else None
+    return [slug for slug in searches[0] if matches is None or slug in matches]
+
+
+def __get_driver_limits__(args) -> dict:
+    return dict(max_driver_memory=int(args.max_driver_memory * 1024 * 1024) if args.max_driver_memory else None,
+                max_profiles_per_driver=args.recycle_after or None)
+
+
+def __get_chrome_options__(args):
+    if not args.headless:
+        return None
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    return options
+
+
+def __add_cache_arguments__(parser: argparse.ArgumentParser):
+    parser.add_argument("--cache-dir", help="Serve fresh profiles from, and store scraped ones in, this directory.")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_CACHE_TTL_HOURS,
+                        help="Hours a cached profile stays fresh.")
+    parser.add_argument("--cache-size", type=int, help="Most profiles to keep, least recently used are evicted.")
+
+
+def __add_render_arguments__(parser: argparse.ArgumentParser):
+    parser.add_argument("--streaming", action="store_true",
+                        help="Write the .docx with the streaming writer instead of python-docx.")
+
+
+def __add_search_arguments__(parser: argparse.ArgumentParser):
+    parser.add_argument("--company", help="Profiles with an experience at this company.")
+    parser.add_argument("--school", help="Profiles with an education at this school.")
+    parser.add_argument("--title", help="Profiles with an experience or project with this title.")
+    parser.add_argument("--query", help='Full text query, e.g. \'description:python AND company:"acme corp"\'.')
+
+
+def __add_browser_arguments__(parser: argparse.ArgumentParser):
+    parser.add_argument("-u", "--username", help="LinkedIn login, defaults to $LINKEDIN_USERNAME. "
+                                                 "The password is read from $LINKEDIN_PASSWORD or prompted.")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome without a window.")
+    parser.add_argument("--parallel-sections", action="store_true",
+                        help="Load the detail pages of a profile in parallel tabs.")
+    parser.add_argument("--full-pages", action="store_true",
+                        help="Load images, fonts, media and trackers, which batch and headless runs block.")
+    parser.add_argument("--session-dir", help="Directory of saved login sessions, defaults to ~/.linkedinToCV/sessions.")
+    parser.add_argument("--no-session", action="store_true",
+                        help="Always log in with the password instead of restoring a saved session.")
+    parser.add_argument("--max-driver-memory", type=float, default=DEFAULT_MAX_DRIVER_MEMORY_MB,
+                        help="MB of memory Chrome may use before its driver is replaced and logged back in. "
+                             "0 disables.")
+    parser.add_argument("--recycle-after", type=int,
+                        help="Replace the driver after this many profiles, whatever its memory.")
+    parser.add_argument("--archive", help="Store the html of every page read in this directory, see reparse.")
+
+
+def __batch__(args) -> int:
+    from batchScraper import read_slugs
+
+    slugs = read_slugs(args.slugs)
+    priorities = {}
+    if args.urgent:
+        from scrapeScheduler import URGENT
+        urgent_slugs = read_slugs(args.urgent)
+        priorities = {slug: URGENT for slug in urgent_slugs}
+        slugs = urgent_slugs + slugs
+    user_id, user_pass = __get_credentials__(args)
+    batch_options = dict(num_workers=args.workers, profile_cache=__get_cache__(args),
+                         chrome_options=__get_chrome_options__(args), parallel_sections=args.parallel_sections,
+                         session_store=__get_session_store__(args), lean_loading=not args.full_pages,
+                         http_workers=args.http_workers, profiles_per_hour=args.rate or None,
+                         priorities=priorities, page_archive=__get_archive__(args), **__get_driver_limits__(args))
+    journal = None
+    if args.journal:
+        from batchJournal import BatchJournal
+        journal = BatchJournal(args.journal)
+        batch_options["journal"] = journal
+    index = __get_index__(args)
+
+    if args.output:
+        # CVs are rendered and written while the workers keep scraping
+        from cvPipeline import ScrapeStream, CVWriter
+        stream = ScrapeStream(slugs, user_id, user_pass, **batch_options)
+        with CVWriter(args.output, args.streaming) as writer:
+            for profile in stream:
+                if index is not None:
+                    index.add(profile)
+                writer.write(profile)
+        result = stream.result
+        result.failures.update(writer.failures)
+        print(writer.summary())
+    else:
+        from batchScraper import scrape_batch
+        result = scrape_batch(slugs, user_id, user_pass, on_profile=index.add if index is not None else None,
+                              **batch_options)
+    if journal is not None:
+        journal.close()
+    print(result.summary())
+    if batch_options["page_archive"] is not None:
+        print(batch_options["page_archive"].summary())
+    for slug, reason in result.failures.items():
+        print(f"Failed {slug}: {reason}")
+    return 0 if len(result.failures) == 0 else 1
+
+
+def __cv__(args) -> int:
+    slug = args.slug.rstrip('/').split('/in/')[-1]
+    output = args.output or f"{slug}.docx"
+    profile_cache = __get_cache__(args)
+
+    # Render straight from the cache when we can, this never touches Selenium
+    profile = None
+    if profile_cache is not None:
+        profile = profile_cache.get(slug)
+        if profile is None and args.allow_stale:
+            loaded = profile_cache.load(slug)
+            profile = loaded[0] if loaded is not None else None
+
+    if profile is None:
+        from linkedinObjects import LinkedinInstance, LinkedinProfile, LoginStatus
+
+        user_id, user_pass = __get_credentials__(args)
+        instance = LinkedinInstance(__get_chrome_options__(args), parallel_sections=args.parallel_sections,
+                                    profile_cache=profile_cache, session_store=__get_session_store__(args),
+                                    lean_loading=args.headless and not args.full_pages,
+                                    page_archive=__get_archive__(args), **__get_driver_limits__(args))
+        try:
+            login_status = instance.attempt_login(user_id, user_pass)
+            if login_status != LoginStatus.SUCCESS:
+                print(f"Login failed ({login_status.name}).")
+                return 1
+            profile = LinkedinProfile(slug)
+            instance.scrape_profile(profile)
+            if instance.last_load_stats is not None:
+                print(f"Loaded {instance.last_load_stats.summary()}")
+        finally:
+            instance.terminate()
+
+    profile.create_cv(args.streaming).save(output)
+    print(f"Saved {output}")
+    return 0
+
+
+def __corpus__(args) -> int:
+    from profileCorpus import ProfileCorpus
+    from processMemory import format_bytes
+
+    profile_cache = __get_cache__(args)
+    if profile_cache is None:
+        print("corpus needs --cache-dir to read the profiles from.")
+        return 1
+    corpus = ProfileCorpus.from_profiles(profile_cache.iter_profiles(allow_stale=args.allow_stale))
+    corpus.save(args.output_dir)
+    print(f"Saved {len(corpus)} profiles to {args.output_dir} ({format_bytes(corpus.memory_usage())} in memory)")
+    return 0
+
+
+def __index__(args) -> int:
+    profile_cache = __get_cache__(args)
+    if profile_cache is None:
+        print("index needs --cache-dir to read the profiles from.")
+        return 1
+    index = __get_index__(args)
+    count = index.add_many(profile_cache.iter_profiles(allow_stale=args.allow_stale))
+    print(f"Indexed {count} profiles into {args.index}, {len(index)} in total")
+    return 0
+
+
+def __search__(args) -> int:
+    try:
+        slugs = __search_index__(args, __get_index__(args))
+    except sqlite3.OperationalError as e:
+        print(f"Invalid search query {args.query!r}: {e}")
+        return 1
+    if slugs is None:
+        print("search needs at least one of --company, --school, --title or --query.")
+        return 1
+    # One slug per line, ready for render --slugs or batch
+    for slug in slugs:
+        print(slug)
+    return 0
+
+
+def __render__(args) -> int:
+    from bulkRender import render_bulk
+
+    slugs = None
+    if args.slugs:
+        from batchScraper import read_slugs
+        slugs = read_slugs(args.slugs)
+    index = __get_index__(args)
+    if index is not None:
+        try:
+            matches = __search_index__(args, index)
+        except sqlite3.OperationalError as e:
+            print(f"Invalid search query {args.query!r}: {e}")
+            return 1
+        if matches is not None:
+            match_set = set(matches)
+            slugs = matches if slugs is None else [slug for slug in slugs if slug in match_set]
+
+    if args.corpus:
+        from profileCorpus import ProfileCorpus
+        corpus = ProfileCorpus.load(args.corpus)
+        profiles = (corpus.select(slugs) if slugs is not None else corpus).iter_profiles()
+    else:
+        profile_cache = __get_cache__(args)
+        if profile_cache is None:
+            print("render needs --cache-dir or --corpus to read the profiles from.")
+            return 1
+        profiles = profile_cache.iter_profiles(slugs, allow_stale=args.allow_stale)
+    stats = render_bulk(profiles, args.output_dir, processes=args.processes, max_in_flight=args.max_in_flight,
+                        streaming=args.streaming)
+    print(stats.summary())
+    for slug, reason in stats.failures.items():
+        print(f"Failed {slug}: {reason}")
+    return 0 if len(stats.failures) == 0 else 1
+
+
+def __reparse__(args) -> int:
+    from pageArchive import PageArchive, reparse_archive
+
+    profile_cache = __get_cache__(args)
+    index = __get_index__(args)
+    if profile_cache is None and index is None and not args.output:
+        print("reparse needs --cache-dir, --index or --output to put the profiles in.")
+        return 1
+    slugs = None
+    if args.slugs:
+        from batchScraper import read_slugs
+        slugs = read_slugs(args.slugs)
+
+    output = nullcontext()
+    if args.output:
+        from cvPipeline import CVWriter
+        output = CVWriter(args.output, args.streaming)
+    with output as writer:
+        def on_profile(profile, archived_at: float):
+            # Cached as of when its pages were downloaded, so the cache TTL still says how old the data is
+            if profile_cache is not None:
+                profile_cache.put(profile, cached_at=archived_at)
+            if index is not None:
+                index.add(profile)
+            if writer is not None:
+                writer.write(profile)
+
+        stats = reparse_archive(PageArchive(args.archive), slugs, processes=args.processes, on_profile=on_profile)
+    print(stats.summary())
+    if writer is not None:
+        print(writer.summary())
+        stats.failures.update(writer.failures)
+    for slug, reason in stats.failures.items():
+        print(f"Failed {slug}: {reason}")
+    return 0 if len(stats.failures) == 0 else 1
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Scrape LinkedIn profiles and generate CVs without the UI.")
+    parser.add_argument("--metrics", help="Time every phase and write the metrics to this file, as Prometheus text "
+                                          "for .prom files and JSON otherwise. Render workers are not included.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subparsers.add_parser("batch", help="Scrape a list of slugs across several browser workers.")
+    batch_parser.add_argument("slugs", help="File with one profile slug or url per line.")
+    batch_parser.add_argument("-w", "--workers", type=int, default=2, help="Number of logged in browsers.")
+    batch_parser.add_argument("--http-workers", type=int, default=0,
+                              help="Download profiles over plain HTTP with the saved session on this many threads "
+                                   "first, loading only the ones that need JavaScript in a browser. 0 disables.")
+    batch_parser.add_argument("-o", "--output", "--output-dir", dest="output",
+                              help="Directory, or .zip archive, to write a CV for every scraped profile to.")
+    batch_parser.add_argument("--index", help="Add every scraped profile to this search index.")
+    batch_parser.add_argument("--rate", type=float, default=DEFAULT_PROFILES_PER_HOUR,
+                              help="Most profiles per hour for the account, slowed down further while LinkedIn "
+                                   "throttles. 0 disables the limit.")
+    batch_parser.add_argument("--urgent", help="File of slugs to scrape before any other.")
+    batch_parser.add_argument("--journal",
+                              help="Record progress in this file, running again with it skips the finished work.")
+    __add_render_arguments__(batch_parser)
+    __add_browser_arguments__(batch_parser)
+    __add_cache_arguments__(batch_parser)
+    batch_parser.set_defaults(handler=__batch__)
+
+    cv_parser = subparsers.add_parser("cv", help="Generate the CV of one profile, from the cache when possible.")
+    cv_parser.add_argument("slug", help="Profile slug or url.")
+    cv_parser.add_argument("-o", "--output", help="Path of the .docx to write, defaults to <slug>.docx.")
+    cv_parser.add_argument("--allow-stale", action="store_true",
+                           help="Render an expired cached profile instead of scraping it again.")
+    __add_render_arguments__(cv_parser)
+    __add_browser_arguments__(cv_parser)
+    __add_cache_arguments__(cv_parser)
+    cv_parser.set_defaults(handler=__cv__)
+
+    render_parser = subparsers.add_parser("render", help="Render CVs for cached profiles across a process pool.")
+    render_parser.add_argument("-o", "--output-dir", required=True, help="Directory to write the CVs to.")
+    render_parser.add_argument("--slugs", help="File of slugs to render, defaults to every cached profile.")
+    render_parser.add_argument("-p", "--processes", type=int, help="Worker processes, defaults to every core.")
+    render_parser.add_argument("--max-in-flight", type=int,
+                               help="Most CVs queued at once, defaults to twice the number of processes.")
+    render_parser.add_argument("--allow-stale", action="store_true", help="Also render expired cached profiles.")
+    render_parser.add_argument("--corpus", help="Read the profiles from this corpus directory instead of the cache.")
+    render_parser.add_argument("--index", help="Search index to pick the profiles with, see the search options.")
+    __add_search_arguments__(render_parser)
+    __add_render_arguments__(render_parser)
+    __add_cache_arguments__(render_parser)
+    render_parser.set_defaults(handler=__render__)
+
+    corpus_parser = subparsers.add_parser("corpus", help="Pack the cached profiles into a columnar corpus.")
+    corpus_parser.add_argument("-o", "--output-dir", required=True, help="Directory to write the corpus tables to.")
+    corpus_parser.add_argument("--allow-stale", action="store_true", help="Also include expired cached profiles.")
+    __add_cache_arguments__(corpus_parser)
+    corpus_parser.set_defaults(handler=__corpus__)
+
+    index_parser = subparsers.add_parser("index", help="Add the cached profiles to a full text search index.")
+    index_parser.add_argument("--index", required=True, help="SQLite file of the index, created if missing.")
+    index_parser.add_argument("--allow-stale", action="store_true", help="Also index expired cached profiles.")
+    __add_cache_arguments__(index_parser)
+    index_parser.set_defaults(handler=__index__)
+
+    search_parser = subparsers.add_parser("search", help="Print the slugs of the indexed profiles that match.")
+    search_parser.add_argument("--index", required=True, help="SQLite file of the index.")
+    __add_search_arguments__(search_parser)
+    search_parser.set_defaults(handler=__search__)
+
+    reparse_parser = subparsers.add_parser("reparse",
+                                           help="Rebuild profiles from archived pages with the current parsers.")
+    reparse_parser.add_argument("archive", help="Directory the pages were archived to with --archive.")
+    reparse_parser.add_argument("--slugs", help="File of slugs to rebuild, defaults to every archived profile.")
+    reparse_parser.add_argument("-p", "--processes", type=int, help="Worker processes, defaults to every core.")
+    reparse_parser.add_argument("--index", help="Add every rebuilt profile to this search index.")
+    reparse_parser.add_argument("-o", "--output", "--output-dir", dest="output",
+                                help="Directory, or .zip archive, to write a CV for every rebuilt profile to.")
+    __add_render_arguments__(reparse_parser)
+    __add_cache_arguments__(reparse_parser)
+    reparse_parser.set_defaults(handler=__reparse__)
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    args = create_parser().parse_args(argv)
+    if not args.metrics:
+        return args.handler(args)
+
+    from metrics import METRICS
+    METRICS.enabled = True
+    try:
+        return args.handler(args)
+    finally:
+        METRICS.export(args.metrics)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
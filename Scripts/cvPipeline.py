@@ -0,0 +1,99 @@
+import os
+import threading
+import zipfile
+from io import BytesIO
+from queue import Queue
+from time import perf_counter
+
+from batchScraper import scrape_batch, BatchResult
+from linkedinProfile import LinkedinProfile
+from metrics import METRICS
+
+
+class ScrapeStream:
+    # Iterates over the profiles of a batch as the workers finish them, the batch runs on a background thread
+    def __init__(self, slugs: list[str], user_id: str, user_pass: str, **batch_options):
+        self.slugs = slugs
+        self.user_id = user_id
+        self.user_pass = user_pass
+        self.batch_options = batch_options
+        # Set once every profile has been yielded
+        self.result: BatchResult | None = None
+        # Raised again by the iterator once the profiles that did arrive are yielded
+        self.error: Exception | None = None
+
+    def __run__(self, profiles: Queue):
+        try:
+            self.result = scrape_batch(self.slugs, self.user_id, self.user_pass, on_profile=profiles.put,
+                                       **self.batch_options)
+        except Exception as e:
+            self.error = e
+        finally:
+            # Marks the end of the stream even when the batch failed
+            profiles.put(None)
+
+    def __iter__(self):
+        profiles = Queue()
+        thread = threading.Thread(target=self.__run__, args=(profiles,), daemon=True)
+        thread.start()
+        while True:
+            profile = profiles.get()
+            if profile is None:
+                break
+            yield profile
+        thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+class CVWriter:
+    # Writes each CV as soon as it is rendered, into a directory or a single .zip, so only one is held in memory
+    def __init__(self, output: str, streaming: bool = False):
+        self.output = output
+        self.streaming = streaming
+        self.written = 0
+        self.failures: dict[str, str] = {}
+        self.render_time = 0.0
+        self.archive = None
+
+    def __enter__(self) -> "CVWriter":
+        if self.output.lower().endswith(".zip"):
+            if os.path.dirname(self.output):
+                os.makedirs(os.path.dirname(self.output), exist_ok=True)
+            # .docx files are already deflated, compressing them again only costs time
+            self.archive = zipfile.ZipFile(self.output, "w", zipfile.ZIP_STORED)
+        else:
+            os.makedirs(self.output, exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.archive is not None:
+            self.archive.close()
+        return False
+
+    def write(self, profile: LinkedinProfile):
+        start = perf_counter()
+        try:
+            with METRICS.timer("pipeline_render"):
+                cv = profile.create_cv(self.streaming)
+                if self.archive is None:
+                    cv.save(os.path.join(self.output, f"{profile.slug}.docx"))
+                else:
+                    document = BytesIO()
+                    cv.save(document)
+                    self.archive.writestr(f"{profile.slug}.docx", document.getvalue())
+        except Exception as e:
+            # One broken CV should not cost the rest of the archive
+            self.failures[profile.slug] = str(e)
+            return
+        finally:
+            self.render_time += perf_counter() - start
+        self.written += 1
+
+    def write_all(self, profiles) -> "CVWriter":
+        for profile in profiles:
+            self.write(profile)
+        return self
+
+    def summary(self) -> str:
+        return f"Wrote {self.written} CVs to {self.output} ({len(self.failures)} failed) in {self.render_time:.1f}s"
@@ -0,0 +1,57 @@
+import json
+import threading
+from collections import OrderedDict
+from hashlib import sha1
+
+from metrics import METRICS
+
+DEFAULT_MAX_FRAGMENTS = 10_000
+
+
+def fragment_key(kind: str, entry, settings: tuple) -> str:
+    # Anything that changes how an entry is drawn has to be part of settings
+    data = json.dumps([kind, entry.to_dict(), settings], sort_keys=True, default=str)
+    return sha1(data.encode("utf-8")).hexdigest()
+
+
+class FragmentCache:
+    # Rendered entries of a CV, kept so regenerating a CV only renders the entries that changed
+    def __init__(self, name: str, max_entries: int = DEFAULT_MAX_FRAGMENTS):
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.__fragments = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.__lock:
+            fragment = self.__fragments.get(key)
+            if fragment is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.__fragments.move_to_end(key)
+        METRICS.count(f"{self.name}_fragment_{'misses' if fragment is None else 'hits'}")
+        return fragment
+
+    def put(self, key: str, fragment):
+        with self.__lock:
+            self.__fragments[key] = fragment
+            self.__fragments.move_to_end(key)
+            while len(self.__fragments) > self.max_entries:
+                self.__fragments.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__fragments.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__fragments)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total > 0 else 0.0
+        return f"{self.name} fragments: {self.hits} hits, {self.misses} misses ({rate:.0%} reused)"
@@ -0,0 +1,130 @@
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from linkedinParsing import parse_section_fingerprints, parse_profile_overview, SECTION_PARSERS
+from linkedinProfile import LinkedinProfile, SECTION_ENTRIES, LINKEDIN_URL
+from metrics import METRICS
+from pageArchive import PROFILE_PAGE
+
+DEFAULT_HTTP_TIMEOUT = 15
+# Pages that come back on these paths mean the session was not accepted
+LOGGED_OUT_PATHS = ["/login", "/authwall", "/checkpoint", "/uas/login"]
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/128.0.0.0 Safari/537.36")
+
+
+class IncompletePage(Exception):
+    # The page needs JavaScript, or the session, to show what we read, so a browser has to load it
+    pass
+
+
+class ThrottledPage(IncompletePage):
+    # LinkedIn sent the request to a checkpoint or login page instead of the profile
+    pass
+
+
+class HttpFetcher:
+    # Downloads profile pages with the cookies of a logged in browser session, no browser needed
+    def __init__(self, cookies: list[dict], base_url: str = LINKEDIN_URL, timeout: float = DEFAULT_HTTP_TIMEOUT,
+                 pool_size: int = 10, profile_cache=None, page_archive=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.profile_cache = profile_cache
+        self.page_archive = page_archive
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml",
+                                     "Accept-Language": "en-US,en;q=0.9"})
+        for cookie in cookies:
+            self.session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""),
+                                     path=cookie.get("path", "/"))
+        # Called when LinkedIn pushes back, so the account's rate limiter can back off the browsers and us alike
+        self.on_throttled = None
+        self.fetched = 0
+        self.fallbacks = 0
+        self.__lock = threading.Lock()
+
+    def __fetch_page__(self, url: str) -> str:
+        with METRICS.timer("http_fetch"):
+            response = self.session.get(url, timeout=self.timeout)
+        if response.status_code != 200:
+            raise IncompletePage(f"{url} returned {response.status_code}")
+        if urlparse(response.url).path.startswith(tuple(LOGGED_OUT_PATHS)):
+            raise ThrottledPage(f"{url} redirected to {response.url}, the session is not logged in")
+        return response.text
+
+    def __archive_page__(self, profile: LinkedinProfile, page: str, html: str):
+        if self.page_archive is not None:
+            with METRICS.timer("archive_page"):
+                self.page_archive.record(profile.slug, page, html)
+
+    def __fetch_pages__(self, profile: LinkedinProfile, previous: LinkedinProfile = None):
+        profile_url = f"{self.base_url}/in/{profile.slug}"
+        html = self.__fetch_page__(profile_url)
+        name, about = parse_profile_overview(html)
+        if not name:
+            raise IncompletePage(f"{profile_url} has no name, it is only rendered by JavaScript")
+        # Only complete pages are archived, the browser archives its own copy of the rest
+        self.__archive_page__(profile, PROFILE_PAGE, html)
+        profile.set_name(name)
+        if about is not None:
+            profile.set_about(about)
+
+        fingerprints = parse_section_fingerprints(html)
+        profile.section_fingerprints = fingerprints
+        # Sections without an archived details page are fetched even when unchanged so reparse can rebuild them
+        archived_pages = {}
+        if self.page_archive is not None:
+            archived_pages = (self.page_archive.manifest(profile.slug) or {"pages": {}})["pages"]
+        for section in ["experience", "projects", "education"]:
+            if section not in fingerprints:
+                continue
+            entries = SECTION_ENTRIES[section]
+            previous_entries = getattr(previous, entries) if previous is not None else []
+            if previous is not None and previous.section_fingerprints.get(section) == fingerprints[section] \
+                    and len(previous_entries) > 0 and (self.page_archive is None or section in archived_pages):
+                setattr(profile, entries, list(previous_entries))
+                METRICS.count("sections_skipped")
+                continue
+            details_url = f"{profile_url}/details/{section}"
+            html = self.__fetch_page__(details_url)
+            # The profile shows the section, so an empty list means the entries are loaded by JavaScript
+            if "artdeco-list__item" not in html:
+                raise IncompletePage(f"{details_url} has no entries in its html")
+            self.__archive_page__(profile, section, html)
+            with METRICS.timer(f"parse_{section}"):
+                setattr(profile, entries, SECTION_PARSERS[section](html))
+
+    def scrape_profile(self, profile: LinkedinProfile) -> bool:
+        # Fills the profile and returns True, or leaves it untouched and returns False when a browser is needed
+        previous = None
+        if self.profile_cache is not None:
+            loaded = self.profile_cache.load(profile.slug)
+            if loaded is not None:
+                previous = loaded[0]
+        fetched = LinkedinProfile(profile.slug)
+        try:
+            self.__fetch_pages__(fetched, previous)
+        except (IncompletePage, requests.RequestException) as e:
+            print(f"Falling back to the browser for {profile.slug}: {e}")
+            with self.__lock:
+                self.fallbacks += 1
+            METRICS.count("http_fallbacks")
+            if isinstance(e, ThrottledPage) and self.on_throttled is not None:
+                self.on_throttled()
+            return False
+        profile.update_from(fetched)
+        with self.__lock:
+            self.fetched += 1
+        METRICS.count("profiles_fetched_http")
+        if self.profile_cache is not None:
+            self.profile_cache.put(profile)
+        return True
+
+    def close(self):
+        self.session.close()
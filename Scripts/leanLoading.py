@@ -0,0 +1,81 @@
+import json
+from copy import deepcopy
+
+from selenium.webdriver.chrome.options import Options
+
+# Extraction only reads text, so nothing that is drawn, played or reported back is ever needed
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*media.licdn.com/*", "*dms.licdn.com/*",
+    "*px.ads.linkedin.com/*", "*snap.licdn.com/*", "*/li/track*", "*/platform-telemetry/*", "*/sensorCollect*",
+    "*doubleclick.net/*", "*google-analytics.com/*", "*googletagmanager.com/*",
+]
+# Blocked requests never report a size, so the bytes they would have cost are estimated from typical LinkedIn sizes
+ESTIMATED_RESOURCE_BYTES = {
+    "Image": 20_000,
+    "Font": 40_000,
+    "Media": 500_000,
+    "Script": 30_000,
+    "XHR": 2_000,
+    "Fetch": 2_000,
+    "Ping": 500,
+    "Other": 2_000,
+}
+
+
+class LoadStats:
+    def __init__(self):
+        # Every request the page made, blocked ones included
+        self.requests = 0
+        self.bytes_received = 0
+        self.blocked_requests = 0
+        self.blocked_by_type: dict[str, int] = {}
+
+    def estimated_bytes_saved(self) -> int:
+        return sum(ESTIMATED_RESOURCE_BYTES.get(resource_type, ESTIMATED_RESOURCE_BYTES["Other"]) * count
+                   for resource_type, count in self.blocked_by_type.items())
+
+    def add(self, other: "LoadStats"):
+        self.requests += other.requests
+        self.bytes_received += other.bytes_received
+        self.blocked_requests += other.blocked_requests
+        for resource_type, count in other.blocked_by_type.items():
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + count
+
+    def summary(self) -> str:
+        return (f"{self.requests - self.blocked_requests} requests, {self.bytes_received / 1_000_000:.1f} MB received, "
+                f"{self.blocked_requests} blocked (~{self.estimated_bytes_saved() / 1_000_000:.1f} MB saved)")
+
+
+def lean_chrome_options(chrome_options: Options = None) -> Options:
+    # Copied so options shared between batch workers are left alone
+    options = Options() if chrome_options is None else deepcopy(chrome_options)
+    # The performance log is what the request and byte counts are read from
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def block_resources(driver):
+    # Applies to the current tab only, every new tab has to be blocked before it navigates
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+
+def collect_load_stats(driver) -> LoadStats:
+    # Reads, and so clears, every network event logged since the last call
+    stats = LoadStats()
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            stats.requests += 1
+        elif method == "Network.loadingFinished":
+            stats.bytes_received += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason") is not None:
+            stats.blocked_requests += 1
+            resource_type = params.get("type", "Other")
+            stats.blocked_by_type[resource_type] = stats.blocked_by_type.get(resource_type, 0) + 1
+    return stats
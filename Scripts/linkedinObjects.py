@@ -1,15 +1,37 @@
-from time import sleep
+from time import sleep, perf_counter
 from enum import Enum
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.select import Select
+from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 
-from bs4 import BeautifulSoup
+from leanLoading import LoadStats, lean_chrome_options, block_resources, collect_load_stats
+from linkedinProfile import LinkedinProfile, SECTION_ENTRIES, LINKEDIN_URL
+from linkedinParsing import parse_education_entry, parse_experience_entry, parse_project_entry, \
+    parse_section_fingerprints
+from listLoading import IncrementalListReader
+from metrics import METRICS
+from pageArchive import PROFILE_PAGE
+from pageReadiness import PageReadiness, PROFILE_READY_SELECTOR, DETAILS_READY_SELECTOR, DEFAULT_PAGE_TIMEOUT, \
+    POLL_FREQUENCY
+from processMemory import process_tree_rss_bytes, format_bytes, DEFAULT_MAX_DRIVER_MEMORY_MB
 
-from CVs import CurriculumVitae, Project, Education, Experience
+
+# LinkedIn sends accounts it wants to slow down to these pages instead of the profile
+THROTTLE_PATHS = ["/checkpoint/", "/authwall", "/login"]
+# Where deleted and mistyped profiles end up, and what the page says
+NOT_FOUND_PATHS = ["/404"]
+NOT_FOUND_TEXTS = ["This page doesn't exist", "This page doesn’t exist"]
+# Chrome and its renderers past this are recycled by callers that keep one driver for a whole session
+DEFAULT_MAX_DRIVER_MEMORY = DEFAULT_MAX_DRIVER_MEMORY_MB * 1024 * 1024
+
+
+class DriverRecycleFailed(WebDriverException):
+    # The fresh driver could not log back in, the instance has no logged in browser until it does
+    pass
 
 
 class LoginStatus(Enum):
@@ -18,282 +40,451 @@ class LoginStatus(Enum):
     VERIFY = 2
 
 
-class LinkedinProfile:
-    def __init__(self, slug: str):
-        self.profile_url = f"https://www.linkedin.com/in/{slug}"
-        self.name = ""
-        self.about = ""
-        self.projects: list[Project] = []
-        self.educations: list[Education] = []
-        self.experiences: list[Experience] = []
-
-    def create_cv(self) -> CurriculumVitae:
-        return CurriculumVitae(self.name, self.experiences, self.educations, self.projects)
-
-    def set_about(self, text: str):
-        self.about = text
-
-    def set_name(self, text: str):
-        self.name = text
-
-    def add_project(self, project: Project):
-        self.projects.append(project)
-
-    def add_education(self, education: Education):
-        self.educations.append(education)
-
-    def add_experience(self, experience: Experience):
-        self.experiences.append(experience)
-
-
 class LinkedinInstance:
-    def __init__(self, chrome_options = None):
+    def __init__(self, chrome_options = None, page_timeout: float = DEFAULT_PAGE_TIMEOUT,
+                 parallel_sections: bool = False, profile_cache=None, base_url: str = LINKEDIN_URL,
+                 session_store=None, on_progress=None, lean_loading: bool = False, page_archive=None,
+                 max_driver_memory: int = None, max_profiles_per_driver: int = None):
         self.user_id = ""
         self.user_pass = ""
+        # Site to talk to, only ever changed to point at a local stand-in for benchmarks
+        self.base_url = base_url.rstrip('/')
+        # Optional ProfileCache, fresh entries are served from it instead of the browser
+        self.profile_cache = profile_cache
+        # Optional SessionStore, a saved session is restored instead of logging in again
+        self.session_store = session_store
+        self.session_restored = False
+        # Optional PageArchive, every page read is stored in it so it can be parsed again without scraping
+        self.page_archive = page_archive
+        # Called with the profile slug and the step just finished, from whichever thread is scraping
+        self.on_progress = on_progress
+        # Called with the profile and the section name as soon as a section's entries are in the profile
+        self.on_section = None
+        self.page_timeout = page_timeout
+        # Load the /details/... pages in separate tabs at the same time instead of one after another
+        self.parallel_sections = parallel_sections
+        # Seconds spent waiting for each kind of page, used to tune the timeout
+        self.wait_times: dict[str, list[float]] = {}
+        # Detail pages that were not loaded because the section matched the cached copy
+        self.last_skipped_sections: list[str] = []
+        self.skipped_sections: dict[str, int] = {}
+        # Block images, fonts, media and trackers, and count what every profile cost
+        self.lean_loading = lean_loading
+        self.last_load_stats: LoadStats | None = None
+        self.load_stats = LoadStats()
+        # Chrome only grows over a long run, so the driver is replaced, and logged back in, once the memory of
+        # its processes passes max_driver_memory bytes or it has scraped max_profiles_per_driver profiles
+        self.max_driver_memory = max_driver_memory
+        self.max_profiles_per_driver = max_profiles_per_driver
+        self.driver_memory = 0
+        self.peak_driver_memory = 0
+        self.profiles_on_driver = 0
+        self.recycles = 0
+        self.__recycle_reason = None
 
         # Create a driver and open a window to login
-        if chrome_options is None:
+        if lean_loading:
+            chrome_options = lean_chrome_options(chrome_options)
+        self.chrome_options = chrome_options
+        self.__start_driver__()
+
+    def __start_driver__(self):
+        if self.chrome_options is None:
             self.driver = webdriver.Chrome()
         else:
-            self.driver = webdriver.Chrome(options=chrome_options)
-
-    def __get_education__(self, linkedin_profile: LinkedinProfile):
-        # Find the elements containing education details
-        education_container = self.driver.find_elements(By.CLASS_NAME, "artdeco-card.pb3")
-        if len(education_container) == 0:
+            self.driver = webdriver.Chrome(options=self.chrome_options)
+        if METRICS.enabled:
+            self.__count_webdriver_calls__()
+        if self.lean_loading:
+            block_resources(self.driver)
+
+    def __count_webdriver_calls__(self):
+        # Every command, including the ones sent through elements, goes through driver.execute
+        execute = self.driver.execute
+
+        def counted_execute(driver_command, params=None):
+            METRICS.count("webdriver_calls")
+            return execute(driver_command, params)
+
+        self.driver.execute = counted_execute
+
+    def __wait_for_page__(self, page_name: str, selector: str) -> bool:
+        # False when the page timed out
+        start = perf_counter()
+        ready = True
+        try:
+            WebDriverWait(self.driver, self.page_timeout, poll_frequency=POLL_FREQUENCY).until(PageReadiness(selector))
+        except TimeoutException:
+            print(f"Timed out waiting for the {page_name} page to load.")
+            ready = False
+        elapsed = perf_counter() - start
+        self.wait_times.setdefault(page_name, []).append(elapsed)
+        METRICS.record_time(f"wait_{page_name}", elapsed)
+        return ready
+
+    def __check_section__(self, profile: LinkedinProfile, section: str, loaded: bool):
+        # The profile shows the section, so a page that did not load or gave no entries is a failed read. Its
+        # fingerprint is dropped so the next scrape loads the page again instead of reusing the empty list
+        if loaded and len(getattr(profile, SECTION_ENTRIES[section])) > 0:
             return
-        education_container = education_container[0]
-        entries = education_container.find_elements(By.CLASS_NAME, "artdeco-list__item")
+        print(f"Could not read the {section} page, it will be loaded again next time.")
+        profile.section_fingerprints.pop(section, None)
+        METRICS.count("sections_failed")
+
+    def __report_progress__(self, profile: LinkedinProfile, step: str):
+        if self.on_progress is not None:
+            self.on_progress(profile.slug, step)
+
+    def __section_finished__(self, profile: LinkedinProfile, section: str, step: str = None):
+        self.__report_progress__(profile, step or section)
+        if self.on_section is not None:
+            self.on_section(profile, section)
+
+    def estimated_time_saved(self) -> float:
+        # Seconds of page loads avoided by skipping unchanged sections, based on the average wait per section
+        saved = 0.0
+        for section, count in self.skipped_sections.items():
+            waits = self.wait_times.get(section, [])
+            if len(waits) > 0:
+                saved += count * sum(waits) / len(waits)
+        return saved
+
+    def __archive_page__(self, profile: LinkedinProfile, page: str, html: str):
+        if self.page_archive is None or html is None:
+            return
+        with METRICS.timer("archive_page"):
+            self.page_archive.record(profile.slug, page, html)
+
+    def __read_list__(self, profile: LinkedinProfile, section: str, parse_entry) -> list:
+        # Parse snapshots of the page instead of querying every span through the driver, scrolling until
+        # the list stops loading more entries
+        reader = IncrementalListReader(self.driver, parse_entry, timeout=self.page_timeout)
+        entries = reader.read()
+        # The last snapshot holds the whole list, a page without entries did not load and is not worth keeping
+        if len(entries) > 0:
+            self.__archive_page__(profile, section, reader.html)
+        return entries
 
-        # Extract details
-        for entry in entries:
-            try:
-                span_elements = entry.find_elements(By.TAG_NAME, "span")
-                actual_info = []
-                for span in span_elements:
-                    classes = span.get_attribute('class')
-                    if any(cls in classes for cls in ['visually-hidden', 'white-space-pre', 't-14']):
-                        continue
-                    actual_info.append(span.text)
-
-                school_name = actual_info[0]
-                degree = actual_info[1]
-                dates = actual_info[2].split('-')
-                start_date = dates[0].strip()
-                end_date = dates[1].strip()
-                ecs = ""
-                i = 3
-                if actual_info[3].startswith("Activities and societies:"):
-                    ecs = actual_info[3].replace("Activities and societies:", "").strip()
-                    i += 1
-                desc = ""
-                while i < len(actual_info):
-                    desc += actual_info[i]
-                    i += 1
-                edu = Education(school_name, "[LOCATION]", degree, ecs, desc, start_date, end_date)
-                linkedin_profile.add_education(edu)
-
-            except Exception as e:
-                print(f"Error extracting education data: {e}")
+    def __get_education__(self, linkedin_profile: LinkedinProfile):
+        with METRICS.timer("parse_education"):
+            for education in self.__read_list__(linkedin_profile, "education", parse_education_entry):
+                linkedin_profile.add_education(education)
 
     def __get_experience__(self, linkedin_profile: LinkedinProfile):
-        # Find the elements containing education details
-        experience_container = self.driver.find_elements(By.CLASS_NAME, "artdeco-card.pb3")
-        if len(experience_container) == 0:
-            return
-        experience_container = experience_container[0]
-        entries = experience_container.find_elements(By.CLASS_NAME, "artdeco-list__item")
-
-        # Extract details
-        for entry in entries:
-            try:
-                span_elements = entry.find_elements(By.TAG_NAME, "span")
-                actual_info = []
-                num_bolds = 0
-                for span in span_elements:
-                    classes = span.get_attribute('class')
-                    if any(cls in classes for cls in ['visually-hidden', 'white-space-pre', 't-14']):
-                        continue
-                    if 't-bold' in span.find_element(By.XPATH, './..').get_attribute('class') or 't-bold' in classes:
-                        num_bolds += 1
-                    actual_info.append(span.text)
-                    # print(span.text)
-                if num_bolds == 1:
-                    # 0 title
-                    title = actual_info[0]
-                    # 1 company · employment type
-                    info = actual_info[1].split('·')
-                    company = info[0].strip()
-                    # 2 start date - end date · duration
-                    info = actual_info[2].split('·')
-                    dates = info[0].split('-')
-                    start_date = dates[0].strip()
-                    end_date = dates[1].strip()
-                    # 3 location · hybrid/on-site
-                    location = actual_info[3].split('·')[0].strip()
-                    # 4 description
-                    description = actual_info[4]
-                    exp = Experience(title, description, company, location, start_date, end_date)
-                    linkedin_profile.add_experience(exp)
-                elif num_bolds > 1:
-                    # 0 Employer
-                    company = actual_info[0]
-                    # 1 Employment type · duration
-                    # 2 location · hybrid/on-site
-                    location = actual_info[2].split('·')[0].strip()
-                    jobs = []
-                    current_job = []
-                    for line in actual_info[3:]:
-                        if line.strip() == '':
-                            jobs.append(current_job)
-                            current_job = []
-                        else:
-                            current_job.append(line)
-                    if current_job and len(current_job) > 0:
-                        jobs.append(current_job)
-                    # 3 space
-                    for job in jobs:
-                        if len(job) == 0:
-                            continue
-                        # 0 title
-                        title = job[0].strip()
-                        # 1 start date - end date · duration
-                        dates = job[1].split('·')[0].split('-')
-                        start_date = dates[0].strip()
-                        end_date = dates[1].strip()
-                        # 2 description
-                        description = job[2] if len(job) > 2 else ''
-                        exp = Experience(title, description, company, location, start_date, end_date)
-                        linkedin_profile.add_experience(exp)
-                        # print("Added: " + exp.title)
-
-                # print('-' * 40)
-            except NoSuchElementException as e:
-                pass
+        with METRICS.timer("parse_experience"):
+            for experience in self.__read_list__(linkedin_profile, "experience", parse_experience_entry):
+                linkedin_profile.add_experience(experience)
 
     def __get_projects__(self, linkedin_profile: LinkedinProfile):
-        # Find the elements containing education details
-        project_container = self.driver.find_elements(By.CLASS_NAME, "artdeco-card.pb3")
-        if len(project_container) == 0:
-            return
-        project_container = project_container[0]
-        entries = project_container.find_elements(By.CLASS_NAME, "artdeco-list__item")
+        with METRICS.timer("parse_projects"):
+            for project in self.__read_list__(linkedin_profile, "projects", parse_project_entry):
+                linkedin_profile.add_project(project)
 
-        # Extract details
-        for entry in entries:
-            try:
-                span_elements = entry.find_elements(By.TAG_NAME, "span")
-                actual_info = []
-                for span in span_elements:
-                    classes = span.get_attribute('class')
-                    if any(cls in classes for cls in ['visually-hidden', 'white-space-pre', 't-14']):
-                        continue
-                    actual_info.append(span.text)
-
-                # 0 title
-                title = actual_info[0].strip()
-                # 1 start date - end date
-                dates = actual_info[1].split('-')
-                start_date = dates[0].strip()
-                end_date = dates[1].strip()
-                # 2 description
-                description = ""
-                for line in actual_info[2:]:
-                    line = line.strip()
-                    if line == '' or line.startswith("Associated with"):
-                        continue
-                    if line.startswith("Skills:"):
-                        break
-                    else:
-                        description += line
-
-                # .. Skills
-                proj = Project(title, description, start_date, end_date)
-                linkedin_profile.add_project(proj)
-            except Exception as e:
-                print(f"Error extracting project data: {e}")
-
-    def scrape_profile(self, profile: LinkedinProfile):
+    def scrape_profile(self, profile: LinkedinProfile, previous: LinkedinProfile = None):
+        # previous, when given, is used instead of the cached copy to skip sections that have not changed
         if profile is None:
             return
+        if self.profile_cache is not None:
+            cached_profile = self.profile_cache.get(profile.slug)
+            if cached_profile is not None:
+                profile.update_from(cached_profile)
+                METRICS.count("profiles_from_cache")
+                self.__report_progress__(profile, "cache")
+                return
+
+        if self.__recycle_reason is not None:
+            self.recycle_driver()
+
+        # A stale copy still tells us which sections have not changed
+        if previous is None and self.profile_cache is not None:
+            loaded = self.profile_cache.load(profile.slug)
+            if loaded is not None:
+                previous = loaded[0]
+        if self.lean_loading:
+            # Drop whatever was logged before this profile, the login for one
+            collect_load_stats(self.driver)
+        with METRICS.timer("scrape_profile"):
+            self.__scrape_pages__(profile, previous)
+        METRICS.count("profiles_scraped")
+        if self.lean_loading:
+            self.__record_load_stats__()
+        # Never cache what a throttled account was shown
+        if self.profile_cache is not None and profile.name and not self.is_throttled(profile):
+            self.profile_cache.put(profile)
+        self.__check_driver__()
+        self.__report_progress__(profile, "done")
+
+    def driver_pid(self) -> int | None:
+        # Chrome and its renderers are all started by chromedriver
+        service = getattr(self.driver, "service", None)
+        process = getattr(service, "process", None)
+        return process.pid if process is not None else None
+
+    def __check_driver__(self):
+        # Measured after every profile, the driver is recycled before the next one rather than in the middle of it
+        self.profiles_on_driver += 1
+        if self.max_driver_memory is not None or METRICS.enabled:
+            pid = self.driver_pid()
+            self.driver_memory = process_tree_rss_bytes(pid) if pid is not None else 0
+            self.peak_driver_memory = max(self.peak_driver_memory, self.driver_memory)
+            METRICS.set_gauge("driver_memory_bytes", self.driver_memory)
+        if self.max_driver_memory is not None and self.driver_memory > self.max_driver_memory:
+            self.__recycle_reason = f"driver memory {format_bytes(self.driver_memory)}"
+        elif self.max_profiles_per_driver is not None and self.profiles_on_driver >= self.max_profiles_per_driver:
+            self.__recycle_reason = f"{self.profiles_on_driver} profiles"
+
+    def recycle_driver(self):
+        # Replaces the driver with a fresh one and logs it back in, from the saved session when there is one
+        reason = self.__recycle_reason or "requested"
+        with METRICS.timer("recycle_driver"):
+            self.save_session()
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                # A driver that has already died is what we are replacing anyway
+                pass
+            self.__start_driver__()
+            self.profiles_on_driver = 0
+            self.recycles += 1
+            METRICS.count("driver_recycles")
+            print(f"Recycled the driver after {reason}")
+            login_status = self.attempt_login(self.user_id, self.user_pass)
+        if login_status != LoginStatus.SUCCESS:
+            # Left set so a later profile tries again
+            raise DriverRecycleFailed(f"Could not log back in after recycling the driver ({login_status.name})")
+        self.__recycle_reason = None
+
+    def __on_throttle_page__(self) -> bool:
+        current_url = self.driver.current_url
+        return any(f"{self.base_url}{path}" in current_url for path in THROTTLE_PATHS)
+
+    def is_throttled(self, profile: LinkedinProfile) -> bool:
+        # Redirected to a checkpoint or login, or handed a page without even the name that is not a missing profile
+        if self.__on_throttle_page__():
+            return True
+        return not profile.name and not self.is_not_found()
+
+    def is_not_found(self, html: str = None) -> bool:
+        # The profile does not exist, a plain failure rather than a reason to slow the account down
+        if any(f"{self.base_url}{path}" in self.driver.current_url for path in NOT_FOUND_PATHS):
+            return True
+        html = self.driver.page_source if html is None else html
+        return any(text in html for text in NOT_FOUND_TEXTS)
+
+    def __record_load_stats__(self):
+        self.last_load_stats = collect_load_stats(self.driver)
+        self.load_stats.add(self.last_load_stats)
+        METRICS.count("requests_blocked", self.last_load_stats.blocked_requests)
+        METRICS.count("bytes_received", self.last_load_stats.bytes_received)
+        METRICS.count("bytes_saved_estimate", self.last_load_stats.estimated_bytes_saved())
+
+    def __profile_url__(self, profile: LinkedinProfile) -> str:
+        return f"{self.base_url}/in/{profile.slug}"
+
+    def __scrape_pages__(self, profile: LinkedinProfile, previous: LinkedinProfile = None):
         # Navigate to profile
-        self.driver.get(profile.profile_url)
-        sleep(1)  # Wait for things to load
-        has_experiences = False
-        has_projects = False
-        has_educations = False
-
-        name_element = self.driver.find_element(By.TAG_NAME, 'h1')
-        profile.set_name(name_element.text)
-
-        # Get the about section
-        about_id_element = self.driver.find_element(By.ID, "about")
-        if about_id_element is not None:
-            about_parent = about_id_element.find_element(By.XPATH, "./..")
+        with METRICS.timer("navigate_profile"):
+            self.driver.get(self.__profile_url__(profile))
+        self.__wait_for_page__("profile", PROFILE_READY_SELECTOR)
+
+        # A checkpoint, login or missing profile page has nothing to read, the profile is left without a name
+        # for the caller to tell which it was
+        html = self.driver.page_source
+        if self.__on_throttle_page__() or self.is_not_found(html):
+            return
+
+        name_elements = self.driver.find_elements(By.TAG_NAME, 'h1')
+        if len(name_elements) > 0:
+            profile.set_name(name_elements[0].text)
+
+        # Get the about section, not every profile has one
+        about_id_elements = self.driver.find_elements(By.ID, "about")
+        if len(about_id_elements) > 0:
+            about_parent = about_id_elements[0].find_element(By.XPATH, "./..")
             if about_parent is not None:
                 spans = about_parent.find_elements(By.TAG_NAME, 'span')
                 if len(spans) > 2:
                     profile.set_about(spans[2].text)
 
-        # Check for the sections of the profile
-        try:
-            self.driver.find_element(By.ID, "experience")
-            has_experiences = True
-        except NoSuchElementException:
-            print("No experiences on profile.")
-        try:
-            self.driver.find_element(By.ID, "education")
-            has_educations = True
-        except NoSuchElementException:
-            print("No educations on profile.")
+        self.__report_progress__(profile, "profile")
+
+        # Check for the sections of the profile, fingerprinting the preview each one shows
+        # A page without even the name in the archive would hide the last good copy of the profile
+        if profile.name and not self.is_throttled(profile):
+            self.__archive_page__(profile, PROFILE_PAGE, html)
+        fingerprints = parse_section_fingerprints(html)
+        profile.section_fingerprints = fingerprints
+        self.last_skipped_sections = []
+        # Sections without an archived details page are loaded even when unchanged, or reparse could not rebuild them
+        archived_pages = {}
+        if self.page_archive is not None:
+            archived_pages = (self.page_archive.manifest(profile.slug) or {"pages": {}})["pages"]
+
+        # Detail pages to visit, in the order they have always been scraped
+        detail_pages = []
+        for section, get_section in [("experience", self.__get_experience__), ("projects", self.__get_projects__),
+                                     ("education", self.__get_education__)]:
+            if section not in fingerprints:
+                print(f"No {section} on profile.")
+                continue
+            previous_entries = getattr(previous, SECTION_ENTRIES[section]) if previous is not None else []
+            if previous is not None and previous.section_fingerprints.get(section) == fingerprints[section] \
+                    and len(previous_entries) > 0 and (self.page_archive is None or section in archived_pages):
+                # Unchanged since the stored copy, reuse its entries instead of loading the details page
+                setattr(profile, SECTION_ENTRIES[section], list(previous_entries))
+                self.last_skipped_sections.append(section)
+                self.skipped_sections[section] = self.skipped_sections.get(section, 0) + 1
+                METRICS.count("sections_skipped")
+                self.__section_finished__(profile, section, f"{section} unchanged")
+                continue
+            detail_pages.append((section, get_section))
+
+        if self.parallel_sections and len(detail_pages) > 1:
+            self.__scrape_details_in_tabs__(profile, detail_pages)
+            return
+        for section, get_section in detail_pages:
+            with METRICS.timer(f"navigate_{section}"):
+                self.driver.get(f"{self.__profile_url__(profile)}/details/{section}")
+            loaded = self.__wait_for_page__(section, DETAILS_READY_SELECTOR)
+            get_section(profile)
+            self.__check_section__(profile, section, loaded)
+            self.__section_finished__(profile, section)
+
+    def __scrape_details_in_tabs__(self, profile: LinkedinProfile, detail_pages: list):
+        # Open every detail page in its own tab so they load at the same time
+        main_window = self.driver.current_window_handle
+        pending = {}
         try:
-            self.driver.find_element(By.ID, "projects")
-            has_projects = True
-        except NoSuchElementException:
-            print("No projects on profile.")
-
-        # Get work experiences
-        if has_experiences:
-            self.driver.get(f"{profile.profile_url}/details/experience")
-            sleep(2)
-            self.__get_experience__(profile)
-        # Get projects
-        if has_projects:
-            self.driver.get(f"{profile.profile_url}/details/projects")
-            sleep(2)
-            self.__get_projects__(profile)
-            pass
-        # Get educations
-        if has_educations:
-            self.driver.get(f"{profile.profile_url}/details/education")
-            sleep(2)
-            self.__get_education__(profile)
-
-    def attempt_login(self, user_id: str, user_pass: str) -> LoginStatus:
+            for section, get_section in detail_pages:
+                known_handles = set(self.driver.window_handles)
+                url = f"{self.__profile_url__(profile)}/details/{section}"
+                # A lean tab opens empty so resources can be blocked before the page starts loading
+                self.driver.execute_script("window.open(arguments[0], '_blank');",
+                                           "about:blank" if self.lean_loading else url)
+                new_handles = [handle for handle in self.driver.window_handles if handle not in known_handles]
+                if len(new_handles) == 0:
+                    raise WebDriverException(f"Could not open a tab for the {section} page.")
+                # Registered before anything else can fail so the finally below closes it
+                pending[new_handles[0]] = (section, get_section, PageReadiness(DETAILS_READY_SELECTOR, url=url))
+                if self.lean_loading:
+                    self.driver.switch_to.window(new_handles[0])
+                    block_resources(self.driver)
+                    self.driver.execute_script("window.location.href = arguments[0];", url)
+                    self.driver.switch_to.window(main_window)
+
+            # Poll the tabs together and parse each one as soon as it is ready
+            start = perf_counter()
+            while len(pending) > 0:
+                timed_out = perf_counter() - start >= self.page_timeout
+                for handle in list(pending):
+                    section, get_section, readiness = pending[handle]
+                    self.driver.switch_to.window(handle)
+                    ready = readiness(self.driver)
+                    if not ready and not timed_out:
+                        continue
+                    if not ready:
+                        print(f"Timed out waiting for the {section} page to load.")
+                    self.wait_times.setdefault(section, []).append(perf_counter() - start)
+                    METRICS.record_time(f"wait_{section}", perf_counter() - start)
+                    get_section(profile)
+                    self.__check_section__(profile, section, ready)
+                    self.__section_finished__(profile, section)
+                    self.driver.close()
+                    del pending[handle]
+                if len(pending) > 0:
+                    sleep(POLL_FREQUENCY)
+        finally:
+            for handle in pending:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(main_window)
+
+    def is_logged_in(self) -> bool:
+        # LinkedIn sends anyone without a valid session from the feed to the login page
+        self.driver.get(f"{self.base_url}/feed/")
+        return self.driver.current_url.startswith(f"{self.base_url}/feed")
+
+    def save_session(self):
+        if self.session_store is None or not self.user_id:
+            return
+        local_storage = self.driver.execute_script(
+            "var items = {};"
+            "for (var i = 0; i < window.localStorage.length; i++) {"
+            "  var key = window.localStorage.key(i); items[key] = window.localStorage.getItem(key);"
+            "}"
+            "return items;")
+        self.session_store.save(self.user_id, self.driver.get_cookies(), local_storage or {})
+
+    def restore_session(self, user_id: str) -> bool:
+        if self.session_store is None:
+            return False
+        session = self.session_store.load(user_id)
+        if session is None:
+            return False
+
+        with METRICS.timer("restore_session"):
+            # Cookies and storage can only be set for the site the browser is on
+            self.driver.get(f"{self.base_url}/login")
+            self.driver.delete_all_cookies()
+            for cookie in session.cookies:
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException:
+                    # Cookies of other LinkedIn subdomains are rejected, the session does not depend on them
+                    pass
+            self.driver.execute_script(
+                "for (var key in arguments[0]) { window.localStorage.setItem(key, arguments[0][key]); }",
+                session.local_storage)
+
+            if not self.is_logged_in():
+                self.driver.delete_all_cookies()
+                self.session_store.remove(user_id)
+                METRICS.count("sessions_expired")
+                return False
         self.user_id = user_id
-        self.user_pass = user_pass
-
-        # navigate to linkedin
-        self.driver.get('https://www.linkedin.com/login')
+        self.session_restored = True
+        METRICS.count("sessions_restored")
+        return True
 
-        # sign in
-        email_field = self.driver.find_element(By.ID, 'username')
-        email_field.send_keys(self.user_id)
-        pass_field = self.driver.find_element(By.ID, 'password')
-        pass_field.send_keys(self.user_pass)
-        sign_in_btn = self.driver.find_element(By.CSS_SELECTOR, 'button.btn__primary--large.from__button--floating')
-        sign_in_btn.click()
-
-        # incorrect username or password
-        if self.driver.current_url == "https://www.linkedin.com/checkpoint/lg/login-submit":
-            return LoginStatus.FAIL
-
-        # needs to have verification
-        if self.driver.current_url != "https://www.linkedin.com/feed/":
+    def confirm_verification(self) -> LoginStatus:
+        # Called once the captcha or code LinkedIn asked for has been entered in the browser
+        if not self.is_logged_in():
             return LoginStatus.VERIFY
-
+        self.save_session()
         return LoginStatus.SUCCESS
 
+    def attempt_login(self, user_id: str, user_pass: str) -> LoginStatus:
+        # Kept so a recycled driver can log in again when the saved session is gone
+        self.user_pass = user_pass
+        if self.restore_session(user_id):
+            return LoginStatus.SUCCESS
+
+        with METRICS.timer("login"):
+            self.user_id = user_id
+            self.user_pass = user_pass
+
+            # navigate to linkedin
+            self.driver.get(f"{self.base_url}/login")
+
+            # sign in
+            email_field = self.driver.find_element(By.ID, 'username')
+            email_field.send_keys(self.user_id)
+            pass_field = self.driver.find_element(By.ID, 'password')
+            pass_field.send_keys(self.user_pass)
+            sign_in_btn = self.driver.find_element(By.CSS_SELECTOR, 'button.btn__primary--large.from__button--floating')
+            sign_in_btn.click()
+
+            # incorrect username or password
+            if self.driver.current_url == f"{self.base_url}/checkpoint/lg/login-submit":
+                return LoginStatus.FAIL
+
+            # needs to have verification
+            if self.driver.current_url != f"{self.base_url}/feed/":
+                return LoginStatus.VERIFY
+
+            self.save_session()
+            return LoginStatus.SUCCESS
+
     def terminate(self):
         self.driver.quit()
 
@@ -0,0 +1,233 @@
+import re
+from hashlib import sha1
+
+import lxml.html
+
+from CVs import Project, Education, Experience
+from metrics import METRICS
+
+SECTION_IDS = ["experience", "education", "projects"]
+
+SKIPPED_SPAN_CLASSES = ['visually-hidden', 'white-space-pre', 't-14']
+
+WHITESPACE_PATTERN = re.compile(r"[ \t\r\f\v\xa0]+")
+
+
+def has_class_xpath(class_name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+# Same lookups the driver did with By.CLASS_NAME "artdeco-card.pb3" and "artdeco-list__item"
+DETAILS_CARD_XPATH = f"(//*[{has_class_xpath('artdeco-card')} and {has_class_xpath('pb3')}])[1]"
+LIST_ITEM_XPATH = f".//*[{has_class_xpath('artdeco-list__item')}]"
+
+
+def parse_page(html: str):
+    return lxml.html.fromstring(html)
+
+
+def __collect_text__(element, parts: list[str]):
+    if element.tag == "br":
+        parts.append("\n")
+    elif isinstance(element.tag, str) and element.text:
+        # Comments have a non string tag and are never rendered
+        parts.append(element.text)
+    for child in element:
+        __collect_text__(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+
+def get_span_text(span) -> str:
+    # Mimic the rendered text WebDriver would give us for the span
+    parts = []
+    __collect_text__(span, parts)
+    lines = [WHITESPACE_PATTERN.sub(" ", line).strip() for line in "".join(parts).split("\n")]
+    return "\n".join(lines).strip()
+
+
+def get_list_entries(page) -> list:
+    # Find the first card holding the details list
+    container = page.xpath(DETAILS_CARD_XPATH)
+    if len(container) == 0:
+        return []
+    return container[0].xpath(LIST_ITEM_XPATH)
+
+
+def get_entry_info(entry) -> tuple[list[str], int]:
+    # Collect the visible span text of a list entry and count the bold lines
+    actual_info = []
+    num_bolds = 0
+    spans_visited = 0
+    for span in entry.iter("span"):
+        spans_visited += 1
+        classes = span.get("class", "")
+        if any(cls in classes for cls in SKIPPED_SPAN_CLASSES):
+            continue
+        parent = span.getparent()
+        parent_classes = parent.get("class", "") if parent is not None else ""
+        if 't-bold' in parent_classes or 't-bold' in classes:
+            num_bolds += 1
+        actual_info.append(get_span_text(span))
+    METRICS.count("spans_visited", spans_visited)
+    return actual_info, num_bolds
+
+
+def parse_entries(html: str, parse_entry) -> list:
+    # parse_entry turns one list item into the entries it describes, a multi-role employer gives several
+    entries = []
+    for entry in get_list_entries(parse_page(html)):
+        entries.extend(parse_entry(entry))
+    return entries
+
+
+def parse_education_entry(entry) -> list[Education]:
+    educations = []
+    try:
+        actual_info, _ = get_entry_info(entry)
+
+        school_name = actual_info[0]
+        degree = actual_info[1]
+        dates = actual_info[2].split('-')
+        start_date = dates[0].strip()
+        end_date = dates[1].strip()
+        ecs = ""
+        i = 3
+        if actual_info[3].startswith("Activities and societies:"):
+            ecs = actual_info[3].replace("Activities and societies:", "").strip()
+            i += 1
+        desc = ""
+        while i < len(actual_info):
+            desc += actual_info[i]
+            i += 1
+        educations.append(Education(school_name, "[LOCATION]", degree, ecs, desc, start_date, end_date))
+    except Exception as e:
+        print(f"Error extracting education data: {e}")
+    return educations
+
+
+def parse_educations(html: str) -> list[Education]:
+    return parse_entries(html, parse_education_entry)
+
+
+def parse_experience_entry(entry) -> list[Experience]:
+    experiences = []
+    try:
+        actual_info, num_bolds = get_entry_info(entry)
+        if num_bolds == 1:
+            # 0 title
+            title = actual_info[0]
+            # 1 company · employment type
+            info = actual_info[1].split('·')
+            company = info[0].strip()
+            # 2 start date - end date · duration
+            info = actual_info[2].split('·')
+            dates = info[0].split('-')
+            start_date = dates[0].strip()
+            end_date = dates[1].strip()
+            # 3 location · hybrid/on-site
+            location = actual_info[3].split('·')[0].strip()
+            # 4 description
+            description = actual_info[4]
+            experiences.append(Experience(title, description, company, location, start_date, end_date))
+        elif num_bolds > 1:
+            # 0 Employer
+            company = actual_info[0]
+            # 1 Employment type · duration
+            # 2 location · hybrid/on-site
+            location = actual_info[2].split('·')[0].strip()
+            jobs = []
+            current_job = []
+            for line in actual_info[3:]:
+                if line.strip() == '':
+                    jobs.append(current_job)
+                    current_job = []
+                else:
+                    current_job.append(line)
+            if current_job and len(current_job) > 0:
+                jobs.append(current_job)
+            # 3 space
+            for job in jobs:
+                if len(job) == 0:
+                    continue
+                # 0 title
+                title = job[0].strip()
+                # 1 start date - end date · duration
+                dates = job[1].split('·')[0].split('-')
+                start_date = dates[0].strip()
+                end_date = dates[1].strip()
+                # 2 description
+                description = job[2] if len(job) > 2 else ''
+                experiences.append(Experience(title, description, company, location, start_date, end_date))
+    except Exception as e:
+        print(f"Error extracting experience data: {e}")
+    return experiences
+
+
+def parse_experiences(html: str) -> list[Experience]:
+    return parse_entries(html, parse_experience_entry)
+
+
+def parse_project_entry(entry) -> list[Project]:
+    projects = []
+    try:
+        actual_info, _ = get_entry_info(entry)
+
+        # 0 title
+        title = actual_info[0].strip()
+        # 1 start date - end date
+        dates = actual_info[1].split('-')
+        start_date = dates[0].strip()
+        end_date = dates[1].strip()
+        # 2 description
+        description = ""
+        for line in actual_info[2:]:
+            line = line.strip()
+            if line == '' or line.startswith("Associated with"):
+                continue
+            if line.startswith("Skills:"):
+                break
+            else:
+                description += line
+
+        # .. Skills
+        projects.append(Project(title, description, start_date, end_date))
+    except Exception as e:
+        print(f"Error extracting project data: {e}")
+    return projects
+
+
+def parse_projects(html: str) -> list[Project]:
+    return parse_entries(html, parse_project_entry)
+
+
+# Details page parser of every section, by the section's name in the url
+SECTION_PARSERS = {"experience": parse_experiences, "projects": parse_projects, "education": parse_educations}
+
+
+def parse_section_fingerprints(html: str) -> dict[str, str]:
+    # Hash the preview of every section on the main profile page, sections the profile lacks are left out
+    page = parse_page(html)
+    fingerprints = {}
+    for section_id in SECTION_IDS:
+        anchors = page.xpath(f"//*[@id='{section_id}']")
+        if len(anchors) == 0:
+            continue
+        section = anchors[0].getparent() if anchors[0].getparent() is not None else anchors[0]
+        text = WHITESPACE_PATTERN.sub(" ", " ".join(section.itertext())).strip()
+        fingerprints[section_id] = sha1(text.encode("utf-8")).hexdigest()
+    return fingerprints
+
+
+def parse_profile_overview(html: str) -> tuple[str | None, str | None]:
+    # The name and about text of the main profile page, the same elements the driver reads
+    page = parse_page(html)
+    headings = page.xpath("//h1")
+    name = get_span_text(headings[0]) if len(headings) > 0 else None
+    about = None
+    anchors = page.xpath("//*[@id='about']")
+    if len(anchors) > 0 and anchors[0].getparent() is not None:
+        spans = list(anchors[0].getparent().iter("span"))
+        if len(spans) > 2:
+            about = get_span_text(spans[2])
+    return name, about
@@ -0,0 +1,79 @@
+from CVs import CurriculumVitae, Project, Education, Experience
+
+
+LINKEDIN_URL = "https://www.linkedin.com"
+
+# Profile attribute holding the entries of each details section
+SECTION_ENTRIES = {
+    "experience": "experiences",
+    "projects": "projects",
+    "education": "educations",
+}
+
+
+class LinkedinProfile:
+    def __init__(self, slug: str):
+        self.slug = slug
+        self.profile_url = f"{LINKEDIN_URL}/in/{slug}"
+        self.name = ""
+        self.about = ""
+        self.projects: list[Project] = []
+        self.educations: list[Education] = []
+        self.experiences: list[Experience] = []
+        # Hash of the preview each section shows on the main profile page
+        self.section_fingerprints: dict[str, str] = {}
+
+    def create_cv(self, streaming: bool = False):
+        # The streaming writer is much faster, CurriculumVitae stays the reference layout
+        if streaming:
+            from streamingCV import StreamingCurriculumVitae
+            return StreamingCurriculumVitae(self.name, self.experiences, self.educations, self.projects)
+        return CurriculumVitae(self.name, self.experiences, self.educations, self.projects)
+
+    def set_about(self, text: str):
+        self.about = text
+
+    def set_name(self, text: str):
+        self.name = text
+
+    def add_project(self, project: Project):
+        self.projects.append(project)
+
+    def add_education(self, education: Education):
+        self.educations.append(education)
+
+    def add_experience(self, experience: Experience):
+        self.experiences.append(experience)
+
+    def update_from(self, other: "LinkedinProfile"):
+        self.name = other.name
+        self.about = other.about
+        self.projects = list(other.projects)
+        self.educations = list(other.educations)
+        self.experiences = list(other.experiences)
+        self.section_fingerprints = dict(other.section_fingerprints)
+
+    def to_dict(self) -> dict:
+        return {
+            "slug": self.slug,
+            "name": self.name,
+            "about": self.about,
+            "projects": [project.to_dict() for project in self.projects],
+            "educations": [education.to_dict() for education in self.educations],
+            "experiences": [experience.to_dict() for experience in self.experiences],
+            "section_fingerprints": self.section_fingerprints,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LinkedinProfile":
+        profile = cls(data["slug"])
+        profile.set_name(data.get("name", ""))
+        profile.set_about(data.get("about", ""))
+        for project in data.get("projects", []):
+            profile.add_project(Project.from_dict(project))
+        for education in data.get("educations", []):
+            profile.add_education(Education.from_dict(education))
+        for experience in data.get("experiences", []):
+            profile.add_experience(Experience.from_dict(experience))
+        profile.section_fingerprints = dict(data.get("section_fingerprints", {}))
+        return profile
@@ -0,0 +1,79 @@
+from hashlib import sha1
+from time import sleep, perf_counter
+
+from linkedinParsing import parse_page, get_list_entries
+from metrics import METRICS
+from pageReadiness import POLL_FREQUENCY, DEFAULT_PAGE_TIMEOUT
+
+# How long the list gets to grow after scrolling before it counts as complete, unless a loader is showing
+LIST_SETTLE_TIME = 0.3
+
+# Scroll to the end of the page, and press "Show more results" where LinkedIn pages the list instead
+LOAD_MORE_SCRIPT = """
+var button = document.querySelector('.scaffold-finite-scroll__load-button');
+if (button && !button.disabled) { button.click(); }
+window.scrollTo(0, document.body.scrollHeight);
+"""
+# Number of entries in the details card and whether more are on their way
+LIST_STATE_SCRIPT = """
+var card = document.querySelector('.artdeco-card.pb3');
+var count = card ? card.querySelectorAll('.artdeco-list__item').length : 0;
+var loading = document.querySelector('.scaffold-finite-scroll__content .artdeco-loader, .artdeco-card.pb3 .artdeco-loader');
+return [count, loading !== null];
+"""
+
+
+def entry_key(entry) -> str:
+    return sha1(" ".join(entry.itertext()).encode("utf-8")).hexdigest()
+
+
+class IncrementalListReader:
+    # Reads a details list that keeps loading entries as the page is scrolled, parsing every entry once
+    def __init__(self, driver, parse_entry, timeout: float = DEFAULT_PAGE_TIMEOUT,
+                 settle_time: float = LIST_SETTLE_TIME):
+        self.driver = driver
+        self.parse_entry = parse_entry
+        self.timeout = timeout
+        self.settle_time = settle_time
+        # Times each entry has been parsed, keyed by its text so re-rendered entries are not parsed again
+        self.seen: dict[str, int] = {}
+        # Page source of the last snapshot, the whole list once read() returns
+        self.html: str | None = None
+
+    def __parse_new_entries__(self, results: list) -> int:
+        self.html = self.driver.page_source
+        entries = get_list_entries(parse_page(self.html))
+        # Two identical entries are both kept, only the occurrences beyond the ones seen before are new
+        occurrences = {}
+        new_entries = 0
+        for entry in entries:
+            key = entry_key(entry)
+            occurrences[key] = occurrences.get(key, 0) + 1
+            if occurrences[key] <= self.seen.get(key, 0):
+                continue
+            self.seen[key] = occurrences[key]
+            results.extend(self.parse_entry(entry))
+            new_entries += 1
+        METRICS.count("list_entries_parsed", new_entries)
+        return len(entries)
+
+    def __load_more__(self, count: int) -> bool:
+        # Returns True once the list has grown past count, False when it has stopped growing
+        self.driver.execute_script(LOAD_MORE_SCRIPT)
+        start = perf_counter()
+        while perf_counter() - start < self.timeout:
+            new_count, loading = self.driver.execute_script(LIST_STATE_SCRIPT)
+            if new_count > count:
+                return True
+            if not loading and perf_counter() - start >= self.settle_time:
+                return False
+            sleep(POLL_FREQUENCY)
+        return False
+
+    def read(self) -> list:
+        results = []
+        while True:
+            count = self.__parse_new_entries__(results)
+            if not self.__load_more__(count):
+                return results
+            METRICS.count("list_scrolls")
@@ -1,4 +1,10 @@
-from UI import create_application
+import sys
 
 if __name__ == "__main__":
+    # Any arguments mean a scripted run, which must not load Qt
+    if len(sys.argv) > 1:
+        from cli import main
+        sys.exit(main())
+
+    from UI import create_application
     create_application()
@@ -0,0 +1,124 @@
+import json
+import threading
+from time import perf_counter
+
+PROMETHEUS_PREFIX = "linkedin_to_cv"
+
+
+class TimingStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "total_seconds": self.total, "max_seconds": self.max,
+                "mean_seconds": self.total / self.count if self.count > 0 else 0.0}
+
+
+class NullTimer:
+    # Handed out while metrics are off so instrumented code pays for almost nothing
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class PhaseTimer:
+    def __init__(self, metrics: "Metrics", phase: str):
+        self.metrics = metrics
+        self.phase = phase
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.record_time(self.phase, perf_counter() - self.start)
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.timings: dict[str, TimingStats] = {}
+        self.counters: dict[str, int] = {}
+        # Values that go up and down, like queue depth, only the latest is kept
+        self.gauges: dict[str, float] = {}
+        self.__lock = threading.Lock()
+
+    def timer(self, phase: str):
+        if not self.enabled:
+            return NULL_TIMER
+        return PhaseTimer(self, phase)
+
+    def record_time(self, phase: str, seconds: float):
+        if not self.enabled:
+            return
+        with self.__lock:
+            if phase not in self.timings:
+                self.timings[phase] = TimingStats()
+            self.timings[phase].add(seconds)
+
+    def count(self, counter: str, amount: int = 1):
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def set_gauge(self, gauge: str, value: float):
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.gauges[gauge] = value
+
+    def reset(self):
+        with self.__lock:
+            self.timings = {}
+            self.counters = {}
+            self.gauges = {}
+
+    def to_dict(self) -> dict:
+        with self.__lock:
+            return {"timings": {phase: stats.to_dict() for phase, stats in self.timings.items()},
+                    "counters": dict(self.counters), "gauges": dict(self.gauges)}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=1)
+
+    def to_prometheus(self) -> str:
+        data = self.to_dict()
+        lines = [f"# TYPE {PROMETHEUS_PREFIX}_phase_seconds summary"]
+        for phase, stats in data["timings"].items():
+            lines.append(f'{PROMETHEUS_PREFIX}_phase_seconds_sum{{phase="{phase}"}} {stats["total_seconds"]}')
+            lines.append(f'{PROMETHEUS_PREFIX}_phase_seconds_count{{phase="{phase}"}} {stats["count"]}')
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_phase_seconds_max gauge")
+        for phase, stats in data["timings"].items():
+            lines.append(f'{PROMETHEUS_PREFIX}_phase_seconds_max{{phase="{phase}"}} {stats["max_seconds"]}')
+        for counter, value in data["counters"].items():
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{counter}_total counter")
+            lines.append(f"{PROMETHEUS_PREFIX}_{counter}_total {value}")
+        for gauge, value in data["gauges"].items():
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{gauge} gauge")
+            lines.append(f"{PROMETHEUS_PREFIX}_{gauge} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str):
+        # Prometheus text for .prom and .txt files, JSON otherwise
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(text)
+
+
+# Shared by everything in the process, off until enabled
+METRICS = Metrics()
@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+from time import time, perf_counter
+from urllib.parse import quote, unquote
+
+from linkedinParsing import parse_profile_overview, parse_section_fingerprints, SECTION_PARSERS
+from linkedinProfile import LinkedinProfile, SECTION_ENTRIES
+from metrics import METRICS
+
+# Pages are written once and read back by every re-parse, so a little more compression is worth it
+COMPRESSION_LEVEL = 9
+PROFILE_PAGE = "profile"
+# Slugs handed to a re-parse process at a time, enough to keep the cost of sending them small
+REPARSE_CHUNK_SIZE = 16
+
+
+class PageArchive:
+    # Every page the scrapers downloaded, compressed and stored once under the hash of its html, with a manifest
+    # per profile naming the latest copy of its main page and of each details page
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.pages_archived = 0
+        self.duplicates = 0
+        self.bytes_raw = 0
+        self.bytes_stored = 0
+        self.__lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "profiles"), exist_ok=True)
+
+    def __object_path__(self, key: str) -> str:
+        return os.path.join(self.directory, "objects", key[:2], key[2:])
+
+    def __manifest_path__(self, slug: str) -> str:
+        return os.path.join(self.directory, "profiles", f"{quote(slug, safe='')}.json")
+
+    def put(self, html: str) -> str:
+        # Returns the key of the page, a page seen before is not written again
+        data = html.encode("utf-8")
+        key = sha256(data).hexdigest()
+        path = self.__object_path__(key)
+        if os.path.exists(path):
+            with self.__lock:
+                self.duplicates += 1
+            METRICS.count("archive_duplicates")
+            return key
+        compressed = zlib.compress(data, COMPRESSION_LEVEL)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as object_file:
+            object_file.write(compressed)
+        os.replace(temp_path, path)
+        with self.__lock:
+            self.pages_archived += 1
+            self.bytes_raw += len(data)
+            self.bytes_stored += len(compressed)
+        METRICS.count("archive_pages")
+        METRICS.count("archive_bytes_stored", len(compressed))
+        return key
+
+    def get(self, key: str) -> str:
+        with open(self.__object_path__(key), "rb") as object_file:
+            return zlib.decompress(object_file.read()).decode("utf-8")
+
+    def record(self, slug: str, page: str, html: str):
+        # page is PROFILE_PAGE or the name of a details section, a page skipped as unchanged keeps its last copy
+        key = self.put(html)
+        with self.__lock:
+            manifest = self.manifest(slug) or {"slug": slug, "pages": {}}
+            manifest["pages"][page] = {"key": key, "archived_at": time()}
+            path = self.__manifest_path__(slug)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file)
+            os.replace(temp_path, path)
+
+    def manifest(self, slug: str) -> dict | None:
+        try:
+            with open(self.__manifest_path__(slug), encoding="utf-8") as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+
+    def pages(self, slug: str) -> dict[str, str]:
+        # The html of every archived page of the profile, by page name
+        manifest = self.manifest(slug)
+        if manifest is None:
+            return {}
+        return {page: self.get(entry["key"]) for page, entry in manifest["pages"].items()}
+
+    def slugs(self) -> list[str]:
+        return sorted(unquote(name[:-len(".json")]) for name in os.listdir(os.path.join(self.directory, "profiles"))
+                      if name.endswith(".json"))
+
+    def summary(self) -> str:
+        ratio = self.bytes_raw / self.bytes_stored if self.bytes_stored > 0 else 0.0
+        return (f"Archived {self.pages_archived} pages ({self.duplicates} already archived), "
+                f"{self.bytes_raw / 1e6:.1f} MB stored as {self.bytes_stored / 1e6:.1f} MB ({ratio:.1f}x)")
+
+
+def parse_archived_profile(slug: str, pages: dict[str, str]) -> LinkedinProfile:
+    # Rebuilds the profile from its pages exactly as the scrapers would, raising ValueError when a page is missing
+    if PROFILE_PAGE not in pages:
+        raise ValueError("no profile page archived")
+    profile = LinkedinProfile(slug)
+    name, about = parse_profile_overview(pages[PROFILE_PAGE])
+    if not name:
+        raise ValueError("the archived profile page has no name")
+    profile.set_name(name)
+    if about is not None:
+        profile.set_about(about)
+    profile.section_fingerprints = parse_section_fingerprints(pages[PROFILE_PAGE])
+    for section, parse_section in SECTION_PARSERS.items():
+        if section not in profile.section_fingerprints:
+            continue
+        if section not in pages:
+            raise ValueError(f"no {section} page archived")
+        setattr(profile, SECTION_ENTRIES[section], parse_section(pages[section]))
+    return profile
+
+
+def __reparse_slug__(directory: str, slug: str) -> tuple[str, dict | None, float | None, str | None, int]:
+    # (slug, profile dict, when its main page was archived, error, pages parsed), plain data so it pickles cheaply
+    archive = PageArchive(directory)
+    manifest = archive.manifest(slug)
+    if manifest is None:
+        return slug, None, None, "not in the archive", 0
+    try:
+        pages = archive.pages(slug)
+        profile = parse_archived_profile(slug, pages)
+    except Exception as e:
+        return slug, None, None, str(e), 0
+    return slug, profile.to_dict(), manifest["pages"][PROFILE_PAGE]["archived_at"], None, len(pages)
+
+
+class ReparseStats:
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.profiles = 0
+        self.pages = 0
+        self.failures: dict[str, str] = {}
+        self.elapsed = 0.0
+
+    def pages_per_minute(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return self.pages / self.elapsed * 60
+
+    def summary(self) -> str:
+        return (f"Re-parsed {self.profiles} profiles ({len(self.failures)} failed) from {self.pages} pages with "
+                f"{self.processes} processes in {self.elapsed:.1f}s, {self.pages_per_minute():.0f} pages/min")
+
+
+def reparse_archive(archive: PageArchive, slugs: list[str] = None, processes: int = None,
+                    on_profile=None) -> ReparseStats:
+    # Runs the current extractors over the archived pages on every core, no browser or network involved.
+    # on_profile is called in this process with each profile and when its main page was archived
+    slugs = archive.slugs() if slugs is None else slugs
+    processes = processes or os.cpu_count() or 1
+    stats = ReparseStats(processes)
+    start = perf_counter()
+    with ProcessPoolExecutor(processes) as executor:
+        results = executor.map(__reparse_slug__, [archive.directory] * len(slugs), slugs,
+                               chunksize=REPARSE_CHUNK_SIZE)
+        for slug, profile_data, archived_at, error, pages in results:
+            if error is not None:
+                stats.failures[slug] = error
+                continue
+            stats.profiles += 1
+            stats.pages += pages
+            if on_profile is not None:
+                try:
+                    on_profile(LinkedinProfile.from_dict(profile_data), archived_at)
+                except Exception as e:
+                    stats.failures[slug] = str(e)
+    stats.elapsed = perf_counter() - start
+    return stats
@@ -0,0 +1,43 @@
+from time import perf_counter
+
+from selenium.webdriver.common.by import By
+
+# Section anchors on the main profile page
+PROFILE_READY_SELECTOR = "#experience, #education, #projects"
+# Entries of the list on a /details/... page
+DETAILS_READY_SELECTOR = ".artdeco-card.pb3 .artdeco-list__item"
+
+DEFAULT_PAGE_TIMEOUT = 10
+POLL_FREQUENCY = 0.1
+# How long a fully loaded page may show none of the elements before we accept it as empty
+EMPTY_PAGE_GRACE = 1.0
+
+
+# Wait condition for WebDriverWait, met once the elements matching the selector are present
+# and their count did not change between two polls
+class PageReadiness:
+    # With url, an empty page only counts once the browser is on it, a new tab's about:blank is complete too
+    def __init__(self, selector: str, empty_grace: float = EMPTY_PAGE_GRACE, url: str = None):
+        self.selector = selector
+        self.empty_grace = empty_grace
+        self.url = url
+        self.last_count = -1
+        self.empty_since = None
+
+    def __call__(self, driver) -> bool:
+        count = len(driver.find_elements(By.CSS_SELECTOR, self.selector))
+        stable = count == self.last_count
+        self.last_count = count
+        if count > 0:
+            self.empty_since = None
+            return stable
+
+        # Nothing matched, only give up on the elements once the document itself is done
+        if self.url is not None and not driver.current_url.startswith(self.url):
+            self.empty_since = None
+            return False
+        if driver.execute_script("return document.readyState") != "complete":
+            return False
+        if self.empty_since is None:
+            self.empty_since = perf_counter()
+        return perf_counter() - self.empty_since >= self.empty_grace
@@ -0,0 +1,125 @@
+import sys
+
+# Chrome's processes together, a long lived driver past this is replaced and logged back in
+DEFAULT_MAX_DRIVER_MEMORY_MB = 2048
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+
+def peak_rss_bytes() -> int:
+    # Highest resident set size of the current process so far, 0 when the platform does not tell us
+    if sys.platform == "win32":
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return 0
+        return counters.PeakWorkingSetSize
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(size: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def __process_table__() -> dict[int, tuple[int, int]]:
+    # Parent pid and resident bytes of every process we can see, by pid
+    processes = {}
+    if sys.platform == "win32":
+        class ProcessEntry(ctypes.Structure):
+            _fields_ = [("dwSize", wintypes.DWORD), ("cntUsage", wintypes.DWORD),
+                        ("th32ProcessID", wintypes.DWORD), ("th32DefaultHeapID", ctypes.c_size_t),
+                        ("th32ModuleID", wintypes.DWORD), ("cntThreads", wintypes.DWORD),
+                        ("th32ParentProcessID", wintypes.DWORD), ("pcPriClassBase", ctypes.c_long),
+                        ("dwFlags", wintypes.DWORD), ("szExeFile", ctypes.c_char * 260)]
+
+        kernel32 = ctypes.windll.kernel32
+        kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        # TH32CS_SNAPPROCESS
+        snapshot = kernel32.CreateToolhelp32Snapshot(0x2, 0)
+        entry = ProcessEntry()
+        entry.dwSize = ctypes.sizeof(entry)
+        parents = {}
+        if kernel32.Process32First(snapshot, ctypes.byref(entry)):
+            while True:
+                parents[entry.th32ProcessID] = entry.th32ParentProcessID
+                if not kernel32.Process32Next(snapshot, ctypes.byref(entry)):
+                    break
+        kernel32.CloseHandle(snapshot)
+        for pid, parent in parents.items():
+            rss = 0
+            # PROCESS_QUERY_LIMITED_INFORMATION
+            handle = kernel32.OpenProcess(0x1000, False, pid)
+            if handle:
+                counters = ProcessMemoryCounters()
+                counters.cb = ctypes.sizeof(counters)
+                if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                    rss = counters.WorkingSetSize
+                kernel32.CloseHandle(handle)
+            processes[pid] = (parent, rss)
+        return processes
+
+    if sys.platform.startswith("linux"):
+        import os
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        for name in os.listdir("/proc"):
+            if not name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{name}/stat") as stat_file:
+                    stat = stat_file.read()
+                with open(f"/proc/{name}/statm") as statm_file:
+                    resident_pages = int(statm_file.read().split()[1])
+            except (OSError, ValueError, IndexError):
+                # Exited while we were looking
+                continue
+            # The command name may hold spaces, the fields after it do not
+            parent = int(stat[stat.rindex(")") + 2:].split()[1])
+            processes[int(name)] = (parent, resident_pages * page_size)
+        return processes
+
+    import subprocess
+    try:
+        output = subprocess.run(["ps", "-A", "-o", "pid=,ppid=,rss="], capture_output=True, text=True,
+                                check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return processes
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) == 3:
+            # ps reports kilobytes
+            processes[int(fields[0])] = (int(fields[1]), int(fields[2]) * 1024)
+    return processes
+
+
+def process_tree_rss_bytes(pid: int) -> int:
+    # Resident set size of a process and every process it started, 0 when the platform does not tell us
+    processes = __process_table__()
+    children = {}
+    for child, (parent, _) in processes.items():
+        children.setdefault(parent, []).append(child)
+    total = 0
+    pending = [pid]
+    while len(pending) > 0:
+        current = pending.pop()
+        if current in processes:
+            total += processes[current][1]
+        pending.extend(children.get(current, []))
+    return total
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from time import time
+from urllib.parse import quote, unquote
+
+from linkedinProfile import LinkedinProfile
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+# Share of max_entries removed at once when the cache is full, so the directory is not scanned on every put
+EVICTION_BATCH_FRACTION = 0.1
+
+
+class EvictionPolicy:
+    # Drop the entries that were read least recently
+    LEAST_RECENTLY_USED = "lru"
+    # Drop the entries that were scraped first
+    OLDEST_FIRST = "fifo"
+
+
+class ProfileCache:
+    def __init__(self, directory: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = None,
+                 eviction_policy: str = EvictionPolicy.LEAST_RECENTLY_USED):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.eviction_policy = eviction_policy
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+        # Entries on disk, counted the first time a put needs it and kept up to date after that
+        self.__entry_count: int | None = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __path__(self, slug: str) -> str:
+        return os.path.join(self.directory, f"{quote(slug, safe='')}.json")
+
+    def load(self, slug: str) -> tuple[LinkedinProfile, float] | None:
+        # Returns the cached profile and when it was scraped, however old it is
+        path = self.__path__(slug)
+        try:
+            with open(path, encoding="utf-8") as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        return LinkedinProfile.from_dict(entry["profile"]), entry["cached_at"]
+
+    def is_fresh(self, cached_at: float) -> bool:
+        return self.ttl_seconds is None or time() - cached_at < self.ttl_seconds
+
+    def get(self, slug: str) -> LinkedinProfile | None:
+        loaded = self.load(slug)
+        if loaded is None or not self.is_fresh(loaded[1]):
+            with self.__lock:
+                self.misses += 1
+            return None
+        with self.__lock:
+            self.hits += 1
+        if self.eviction_policy == EvictionPolicy.LEAST_RECENTLY_USED:
+            # The file's modification time doubles as its last use
+            try:
+                os.utime(self.__path__(slug))
+            except OSError:
+                pass
+        return loaded[0]
+
+    def put(self, profile: LinkedinProfile, cached_at: float = None):
+        entry = {
+            "cached_at": time() if cached_at is None else cached_at,
+            "profile": profile.to_dict(),
+        }
+        path = self.__path__(profile.slug)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(entry, cache_file)
+        if self.max_entries is None:
+            os.replace(temp_path, path)
+            return
+        with self.__lock:
+            is_new = not os.path.exists(path)
+            os.replace(temp_path, path)
+            if self.__entry_count is None:
+                self.__entry_count = len(self.__entries__())
+            elif is_new:
+                self.__entry_count += 1
+            if self.__entry_count > self.max_entries:
+                self.__evict__()
+
+    def remove(self, slug: str):
+        try:
+            os.remove(self.__path__(slug))
+        except FileNotFoundError:
+            return
+        with self.__lock:
+            if self.__entry_count is not None:
+                self.__entry_count -= 1
+
+    def __entries__(self) -> list[os.DirEntry]:
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+
+    def evict(self):
+        with self.__lock:
+            self.__evict__()
+
+    def __evict__(self):
+        # Brings the cache a batch below max_entries, the caller holds the lock
+        entries = self.__entries__()
+        self.__entry_count = len(entries)
+        if self.max_entries is None or len(entries) <= self.max_entries:
+            return
+        keep = self.max_entries - int(self.max_entries * EVICTION_BATCH_FRACTION)
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - keep]:
+            try:
+                os.remove(entry.path)
+                self.__entry_count -= 1
+            except FileNotFoundError:
+                pass
+
+    def purge_expired(self) -> int:
+        # Remove every entry past its TTL, returns how many were removed
+        removed = 0
+        for entry in self.__entries__():
+            try:
+                with open(entry.path, encoding="utf-8") as cache_file:
+                    cached_at = json.load(cache_file)["cached_at"]
+            except (OSError, ValueError, KeyError):
+                cached_at = 0
+            if not self.is_fresh(cached_at):
+                os.remove(entry.path)
+                removed += 1
+        with self.__lock:
+            # Counted again by the next put
+            self.__entry_count = None
+        return removed
+
+    def slugs(self) -> list[str]:
+        return [unquote(entry.name[:-len(".json")]) for entry in self.__entries__()]
+
+    def iter_profiles(self, slugs: list[str] = None, allow_stale: bool = False):
+        # Load profiles one at a time, for every cached slug unless slugs are given
+        for slug in slugs if slugs is not None else self.slugs():
+            loaded = self.load(slug)
+            if loaded is None or (not allow_stale and not self.is_fresh(loaded[1])):
+                continue
+            yield loaded[0]
+
+    def __len__(self) -> int:
+        return len(self.__entries__())
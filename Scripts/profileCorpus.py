@@ -0,0 +1,141 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from CVs import Experience, Education, Project
+from linkedinProfile import LinkedinProfile
+
+PROFILE_COLUMNS = ["slug", "name", "about"]
+EXPERIENCE_COLUMNS = ["slug", "title", "description", "company_name", "location", "start_date", "end_date"]
+EDUCATION_COLUMNS = ["slug", "title", "location", "degree", "extracurriculars", "description", "start_date",
+                     "end_date"]
+PROJECT_COLUMNS = ["slug", "title", "description", "start_date", "end_date"]
+
+# Columns with few distinct values are stored as categories, which is where most of the memory goes
+CATEGORY_COLUMNS = ["slug", "title", "company_name", "location", "degree", "extracurriculars", "start_date",
+                    "end_date"]
+TABLES = ["profiles", "experiences", "educations", "projects"]
+ROWS_PER_CHUNK = 10_000
+
+
+def __to_frame__(rows: list[tuple], columns: list[str]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    for column in columns:
+        if column in CATEGORY_COLUMNS:
+            frame[column] = frame[column].astype("category")
+    return frame
+
+
+def __iter_rows__(table: pd.DataFrame):
+    # itertuples turns every column into a list of objects first, a slice at a time keeps that small
+    for start in range(0, len(table), ROWS_PER_CHUNK):
+        yield from table.iloc[start:start + ROWS_PER_CHUNK].itertuples(index=False, name=None)
+
+
+class ProfileCorpus:
+    # A scraped population as one table per entry type, every row keyed by the profile slug
+    def __init__(self, profiles: pd.DataFrame, experiences: pd.DataFrame, educations: pd.DataFrame,
+                 projects: pd.DataFrame):
+        self.profiles = profiles
+        self.experiences = experiences
+        self.educations = educations
+        self.projects = projects
+
+    @classmethod
+    def from_profiles(cls, profiles) -> "ProfileCorpus":
+        # profiles may be any iterable, rows are collected as tuples so no profile has to stay in memory
+        profile_rows = []
+        experience_rows = []
+        education_rows = []
+        project_rows = []
+        for profile in profiles:
+            slug = profile.slug
+            profile_rows.append((slug, profile.name, profile.about))
+            for experience in profile.experiences:
+                experience_rows.append((slug, experience.title, experience.description, experience.company_name,
+                                        experience.location, experience.start_date, experience.end_date))
+            for education in profile.educations:
+                education_rows.append((slug, education.title, education.location, education.degree,
+                                       education.extracurriculars_text, education.description,
+                                       education.start_date, education.end_date))
+            for project in profile.projects:
+                project_rows.append((slug, project.title, project.description, project.start_date,
+                                     project.end_date))
+        return cls(__to_frame__(profile_rows, PROFILE_COLUMNS),
+                   __to_frame__(experience_rows, EXPERIENCE_COLUMNS),
+                   __to_frame__(education_rows, EDUCATION_COLUMNS),
+                   __to_frame__(project_rows, PROJECT_COLUMNS))
+
+    @classmethod
+    def load(cls, directory: str) -> "ProfileCorpus":
+        return cls(*[pd.read_pickle(os.path.join(directory, f"{table}.pkl")) for table in TABLES])
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        for table in TABLES:
+            getattr(self, table).to_pickle(os.path.join(directory, f"{table}.pkl"))
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def slugs(self) -> list[str]:
+        return list(self.profiles["slug"])
+
+    def memory_usage(self) -> int:
+        return sum(int(getattr(self, table).memory_usage(deep=True).sum()) for table in TABLES)
+
+    def select(self, slugs) -> "ProfileCorpus":
+        # Only the given profiles, e.g. the slugs of experiences.loc[experiences.company_name == "Acme"]
+        slugs = set(slugs)
+        return ProfileCorpus(*[getattr(self, table)[getattr(self, table)["slug"].isin(slugs)] for table in TABLES])
+
+    def iter_profiles(self):
+        # Rebuild LinkedinProfile objects one at a time to hand to the CV renderer, walking the entry tables
+        # alongside the profiles so only the rows of the current profile are ever turned into Python objects
+        positions = {slug: position for position, slug in enumerate(self.profiles["slug"])}
+        experiences = self.__rows_in_order__(self.experiences, positions)
+        educations = self.__rows_in_order__(self.educations, positions)
+        projects = self.__rows_in_order__(self.projects, positions)
+        for slug, name, about in self.profiles[PROFILE_COLUMNS].itertuples(index=False, name=None):
+            profile = LinkedinProfile(slug)
+            profile.set_name(name)
+            profile.set_about(about)
+            for _, title, description, company_name, location, start_date, end_date in experiences.take(slug):
+                profile.add_experience(Experience(title, description, company_name, location, start_date, end_date))
+            for _, title, location, degree, extracurriculars, description, start_date, end_date \
+                    in educations.take(slug):
+                profile.add_education(Education(title, location, degree, extracurriculars, description,
+                                                start_date, end_date))
+            for _, title, description, start_date, end_date in projects.take(slug):
+                profile.add_project(Project(title, description, start_date, end_date))
+            yield profile
+
+    @staticmethod
+    def __rows_in_order__(table: pd.DataFrame, positions: dict[str, int]) -> "SlugRows":
+        # Rows ordered like the profiles, entries of one profile keeping their order, rows of unknown slugs dropped
+        # Looked up per category rather than per row, slug is a category column
+        slugs = table["slug"].astype("category")
+        category_keys = np.array([positions.get(slug, -1) for slug in slugs.cat.categories] + [-1])
+        # Code -1, a missing slug, picks the -1 appended at the end
+        keys = category_keys[slugs.cat.codes.to_numpy()]
+        keep = keys >= 0
+        if keep.all() and (np.diff(keys) >= 0).all():
+            # Tables built by from_profiles, or cut down by select, are already in order and need no copy
+            return SlugRows(__iter_rows__(table))
+        order = np.argsort(keys[keep], kind="stable")
+        return SlugRows(__iter_rows__(table[keep].iloc[order]))
+
+
+class SlugRows:
+    # Hands out the consecutive rows of one slug at a time from a table sorted like the profiles
+    def __init__(self, rows):
+        self.rows = rows
+        self.next_row = next(self.rows, None)
+
+    def take(self, slug: str) -> list[tuple]:
+        rows = []
+        while self.next_row is not None and self.next_row[0] == slug:
+            rows.append(self.next_row)
+            self.next_row = next(self.rows, None)
+        return rows
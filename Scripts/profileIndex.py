@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+from time import time
+
+from linkedinProfile import LinkedinProfile
+
+# Entry rows live in a plain table so a profile can be replaced by slug, the FTS table only indexes their text
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    slug TEXT PRIMARY KEY,
+    name TEXT,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    company TEXT,
+    title TEXT,
+    degree TEXT,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_slug ON entries (slug);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    company, title, degree, description,
+    content='entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+"""
+FTS_COLUMNS = ["company", "title", "degree", "description"]
+
+
+def phrase(text: str) -> str:
+    # Quote text so it is matched as words in order, not read as query syntax
+    return '"' + text.replace('"', '""') + '"'
+
+
+def __entry_rows__(profile: LinkedinProfile) -> list[tuple]:
+    # (kind, company, title, degree, description), schools go in company so one column answers "where"
+    rows = []
+    for experience in profile.experiences:
+        rows.append(("experience", experience.company_name, experience.title, None, experience.description))
+    for education in profile.educations:
+        rows.append(("education", education.title, None, education.degree, education.description))
+    for project in profile.projects:
+        rows.append(("project", None, project.title, None, project.description))
+    return rows
+
+
+class ProfileIndex:
+    # Full text index of who worked, studied and built what, answering in milliseconds instead of rescanning profiles
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.__lock = threading.Lock()
+
+    def __remove__(self, slug: str):
+        # External content FTS tables need the old text to drop it from the index
+        self.connection.execute(
+            f"INSERT INTO entries_fts (entries_fts, rowid, {', '.join(FTS_COLUMNS)}) "
+            f"SELECT 'delete', id, {', '.join(FTS_COLUMNS)} FROM entries WHERE slug = ?", (slug,))
+        self.connection.execute("DELETE FROM entries WHERE slug = ?", (slug,))
+        self.connection.execute("DELETE FROM profiles WHERE slug = ?", (slug,))
+
+    def __index_profile__(self, profile: LinkedinProfile):
+        self.__remove__(profile.slug)
+        self.connection.execute("INSERT INTO profiles (slug, name, indexed_at) VALUES (?, ?, ?)",
+                                (profile.slug, profile.name, time()))
+        for kind, company, title, degree, description in __entry_rows__(profile):
+            cursor = self.connection.execute(
+                "INSERT INTO entries (slug, kind, company, title, degree, description) VALUES (?, ?, ?, ?, ?, ?)",
+                (profile.slug, kind, company, title, degree, description))
+            self.connection.execute(
+                f"INSERT INTO entries_fts (rowid, {', '.join(FTS_COLUMNS)}) VALUES (?, ?, ?, ?, ?)",
+                (cursor.lastrowid, company, title, degree, description))
+
+    def add(self, profile: LinkedinProfile):
+        # Replaces whatever was indexed for the slug, safe to call from every batch worker
+        with self.__lock, self.connection:
+            self.__index_profile__(profile)
+
+    def add_many(self, profiles) -> int:
+        # One transaction for the lot, which is what makes indexing a whole cache fast
+        count = 0
+        with self.__lock, self.connection:
+            for profile in profiles:
+                self.__index_profile__(profile)
+                count += 1
+        return count
+
+    def remove(self, slug: str):
+        with self.__lock, self.connection:
+            self.__remove__(slug)
+
+    def search(self, query: str, kind: str = None, limit: int = None) -> list[str]:
+        # query is FTS5 syntax, e.g. 'company:"acme corp"' or 'title:engineer AND description:python'
+        # Slugs come back in the order they were indexed, ranking every match would cost more than the match
+        sql = ("SELECT entries.slug FROM entries_fts JOIN entries ON entries.id = entries_fts.rowid "
+               "WHERE entries_fts MATCH ?")
+        parameters = [query]
+        if kind is not None:
+            sql += " AND entries.kind = ?"
+            parameters.append(kind)
+        sql += " GROUP BY entries.slug ORDER BY MIN(entries.id)"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        with self.__lock:
+            return [row[0] for row in self.connection.execute(sql, parameters)]
+
+    def worked_at(self, company: str, limit: int = None) -> list[str]:
+        return self.search(f"company:{phrase(company)}", kind="experience", limit=limit)
+
+    def studied_at(self, school: str, limit: int = None) -> list[str]:
+        return self.search(f"company:{phrase(school)}", kind="education", limit=limit)
+
+    def with_title(self, title: str, limit: int = None) -> list[str]:
+        return self.search(f"title:{phrase(title)}", limit=limit)
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return self.connection.execute("SELECT count(*) FROM profiles").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,168 @@
+import heapq
+import threading
+from time import monotonic, sleep
+
+from metrics import METRICS
+
+# Lower runs first
+URGENT = 0
+NORMAL = 10
+
+DEFAULT_BURST = 3
+# First pause after LinkedIn pushes back, doubled on every further throttle up to the maximum
+INITIAL_BACKOFF_SECONDS = 60
+MAX_BACKOFF_SECONDS = 30 * 60
+# The rate is halved on a throttle and given back a tenth of the target on every good profile
+MIN_RATE_FRACTION = 0.1
+RECOVERY_FRACTION = 0.1
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class TokenBucket:
+    # rate_per_hour None means no limit, the bucket can still be paused
+    def __init__(self, rate_per_hour: float | None, burst: int = DEFAULT_BURST):
+        self.rate_per_hour = rate_per_hour
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = monotonic()
+        self.paused_until = 0.0
+        self.__lock = threading.Lock()
+
+    def __refill__(self, now: float):
+        if self.rate_per_hour is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate_per_hour / 3600)
+        self.updated = now
+
+    def acquire(self) -> float:
+        # Blocks until a token is free and returns the seconds waited
+        start = monotonic()
+        while True:
+            with self.__lock:
+                now = monotonic()
+                self.__refill__(now)
+                if now >= self.paused_until and (self.rate_per_hour is None or self.tokens >= 1):
+                    self.tokens -= 1
+                    return now - start
+                wait = self.paused_until - now
+                if self.rate_per_hour:
+                    wait = max(wait, (1 - self.tokens) * 3600 / self.rate_per_hour)
+            # Wake up now and then, the rate or the pause may change while we wait
+            sleep(min(max(wait, 0.01), 1.0))
+
+    def set_rate(self, rate_per_hour: float | None):
+        with self.__lock:
+            self.__refill__(monotonic())
+            self.rate_per_hour = rate_per_hour
+
+    def pause(self, seconds: float):
+        with self.__lock:
+            self.paused_until = max(self.paused_until, monotonic() + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+
+class AccountLimiter:
+    # Paces one LinkedIn account: a token bucket at the target rate, halved and paused whenever LinkedIn pushes back
+    def __init__(self, profiles_per_hour: float | None, burst: int = DEFAULT_BURST,
+                 initial_backoff: float = INITIAL_BACKOFF_SECONDS, max_backoff: float = MAX_BACKOFF_SECONDS):
+        self.target_rate = profiles_per_hour
+        self.bucket = TokenBucket(profiles_per_hour, burst)
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff = 0.0
+        self.throttle_events = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self) -> float | None:
+        return self.bucket.rate_per_hour
+
+    def acquire(self) -> float:
+        return self.bucket.acquire()
+
+    def on_success(self):
+        with self.__lock:
+            self.backoff = 0.0
+            if self.target_rate is not None and self.rate < self.target_rate:
+                self.bucket.set_rate(min(self.target_rate, self.rate + self.target_rate * RECOVERY_FRACTION))
+                METRICS.set_gauge("scheduler_rate_per_hour", self.rate)
+
+    def on_throttled(self):
+        with self.__lock:
+            self.throttle_events += 1
+            self.backoff = self.initial_backoff if self.backoff == 0 else min(self.max_backoff, self.backoff * 2)
+            if self.target_rate is not None:
+                self.bucket.set_rate(max(self.target_rate * MIN_RATE_FRACTION, self.rate / 2))
+                METRICS.set_gauge("scheduler_rate_per_hour", self.rate)
+            self.bucket.pause(self.backoff)
+            backoff = self.backoff
+        METRICS.count("throttle_events")
+        print(f"LinkedIn is throttling, pausing for {backoff:.0f}s")
+
+
+class ScrapeScheduler:
+    # Hands slugs to the workers of one account, most urgent first, no faster than the account's limiter allows
+    def __init__(self, limiter: AccountLimiter, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.limiter = limiter
+        self.max_attempts = max_attempts
+        self.__queue: list[tuple[int, int, str]] = []
+        self.__sequence = 0
+        self.priorities: dict[str, int] = {}
+        self.attempts: dict[str, int] = {}
+        self.__submitted_at: dict[str, float] = {}
+        self.queue_wait = 0.0
+        self.rate_wait = 0.0
+        self.__lock = threading.Lock()
+
+    def submit(self, slug: str, priority: int = NORMAL):
+        with self.__lock:
+            self.priorities[slug] = priority
+            self.__submitted_at.setdefault(slug, monotonic())
+            heapq.heappush(self.__queue, (priority, self.__sequence, slug))
+            self.__sequence += 1
+            METRICS.set_gauge("scheduler_queue_depth", len(self.__queue))
+
+    def depth(self) -> int:
+        with self.__lock:
+            return len(self.__queue)
+
+    def next(self) -> str | None:
+        # None once the queue is empty. The token is taken first so a slug submitted while waiting can still go first
+        if self.depth() == 0:
+            return None
+        rate_wait = self.limiter.acquire()
+        with self.__lock:
+            if len(self.__queue) == 0:
+                return None
+            _, _, slug = heapq.heappop(self.__queue)
+            self.attempts[slug] = self.attempts.get(slug, 0) + 1
+            queue_wait = monotonic() - self.__submitted_at.pop(slug, monotonic())
+            self.rate_wait += rate_wait
+            self.queue_wait += queue_wait
+            METRICS.set_gauge("scheduler_queue_depth", len(self.__queue))
+        METRICS.record_time("scheduler_rate_wait", rate_wait)
+        METRICS.record_time("scheduler_queue_wait", queue_wait)
+        return slug
+
+    def drain(self) -> list[str]:
+        # Every queued slug in priority order, without waiting for tokens
+        with self.__lock:
+            slugs = [slug for _, _, slug in sorted(self.__queue)]
+            self.__queue = []
+            METRICS.set_gauge("scheduler_queue_depth", 0)
+        return slugs
+
+    def report_success(self, slug: str):
+        self.limiter.on_success()
+
+    def report_throttled(self, slug: str) -> bool:
+        # Backs off and queues the slug again, returns False once it has used up its attempts
+        self.limiter.on_throttled()
+        if self.attempts.get(slug, 0) >= self.max_attempts:
+            return False
+        self.submit(slug, self.priorities.get(slug, NORMAL))
+        return True
+
+    def summary(self) -> str:
+        rate = "unlimited" if self.limiter.rate is None else f"{self.limiter.rate:.0f}/h"
+        return (f"Scheduler: rate {rate}, {self.limiter.throttle_events} throttle events, "
+                f"{self.rate_wait:.0f}s waiting for the rate limit, {self.depth()} still queued")
@@ -0,0 +1,60 @@
+import json
+import os
+import threading
+from time import time
+from urllib.parse import quote
+
+DEFAULT_SESSION_DIR = os.path.join(os.path.expanduser("~"), ".linkedinToCV", "sessions")
+# LinkedIn sessions last about a year, this only stops us from trying one that is certainly dead
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+
+class SavedSession:
+    def __init__(self, cookies: list[dict], local_storage: dict[str, str], saved_at: float):
+        self.cookies = cookies
+        self.local_storage = local_storage
+        self.saved_at = saved_at
+
+    def to_dict(self) -> dict:
+        return {"saved_at": self.saved_at, "cookies": self.cookies, "local_storage": self.local_storage}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SavedSession":
+        return cls(data["cookies"], data.get("local_storage", {}), data["saved_at"])
+
+
+class SessionStore:
+    # Cookies and local storage of logged in browsers, one file per LinkedIn account
+    def __init__(self, directory: str = DEFAULT_SESSION_DIR, max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __path__(self, user_id: str) -> str:
+        return os.path.join(self.directory, f"{quote(user_id.lower(), safe='')}.json")
+
+    def load(self, user_id: str) -> SavedSession | None:
+        try:
+            with open(self.__path__(user_id), encoding="utf-8") as session_file:
+                session = SavedSession.from_dict(json.load(session_file))
+        except (OSError, ValueError, KeyError):
+            return None
+        if self.max_age_seconds is not None and time() - session.saved_at >= self.max_age_seconds:
+            return None
+        return session
+
+    def save(self, user_id: str, cookies: list[dict], local_storage: dict[str, str]):
+        session = SavedSession(cookies, local_storage, time())
+        path = self.__path__(user_id)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        # The cookies log in as the user, so keep them readable by the owner only
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w",
+                  encoding="utf-8") as session_file:
+            json.dump(session.to_dict(), session_file)
+        os.replace(temp_path, path)
+
+    def remove(self, user_id: str):
+        try:
+            os.remove(self.__path__(user_id))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,218 @@
+import io
+import re
+import threading
+import zipfile
+from xml.sax.saxutils import escape
+
+from docx.shared import Pt, Emu
+
+from CVs import Experience, Education, Project, InformationEntry, build_base_document, BULLET_POINT_STYLE, \
+    RIGHT_TAB_INCHES
+from fragmentCache import FragmentCache, fragment_key
+from metrics import METRICS
+
+DOCUMENT_PART = "word/document.xml"
+NAME_PLACEHOLDER = "<w:t>[NAME]</w:t>"
+# Characters XML 1.0 does not allow, Word will not open a document holding them
+INVALID_XML_CHARACTERS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+
+class CVTemplate:
+    # The parts of the base document every streamed CV shares, taken apart once so each CV only writes its body
+    def __init__(self):
+        document = build_base_document()
+        section = document.sections[0]
+        self.right_tab_twips = Emu(section.page_width - section.right_margin - section.left_margin).twips
+        self.bullet_style_id = document.styles[BULLET_POINT_STYLE].style_id
+        self.bullet_space_after_twips = Pt(2).twips
+        self.header_part = section.first_page_header.part.partname.lstrip('/')
+
+        buffer = io.BytesIO()
+        document.save(buffer)
+        static_buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer) as base_zip, \
+                zipfile.ZipFile(static_buffer, "w", zipfile.ZIP_DEFLATED) as static_zip:
+            for info in base_zip.infolist():
+                data = base_zip.read(info.filename)
+                if info.filename == DOCUMENT_PART:
+                    xml = data.decode("utf-8")
+                    body_start = xml.index("<w:body>") + len("<w:body>")
+                    self.document_prefix = xml[:body_start].encode("utf-8")
+                    self.document_suffix = xml[xml.index("<w:sectPr"):].encode("utf-8")
+                elif info.filename == self.header_part:
+                    self.header_prefix, self.header_suffix = data.decode("utf-8").split(NAME_PLACEHOLDER)
+                else:
+                    static_zip.writestr(info.filename, data)
+        # Already compressed static parts, each CV starts from a copy of these bytes
+        self.static_zip = static_buffer.getvalue()
+
+
+__template = None
+__template_lock = threading.Lock()
+# Body XML of every rendered entry, reused by later CVs that show the same entry
+XML_FRAGMENTS = FragmentCache("xml")
+
+
+def get_template() -> CVTemplate:
+    global __template
+    with __template_lock:
+        if __template is None:
+            __template = CVTemplate()
+    return __template
+
+
+def run_content(text: str) -> str:
+    # Same run content python-docx writes: tabs and line breaks become elements, the rest w:t text
+    content = []
+    for i, chunk in enumerate(text.replace("\r", "\n").split("\n")):
+        if i > 0:
+            content.append("<w:br/>")
+        for j, piece in enumerate(chunk.split("\t")):
+            if j > 0:
+                content.append("<w:tab/>")
+            if piece != "":
+                content.append(text_element(piece))
+    return "".join(content)
+
+
+def text_element(text: str) -> str:
+    # Rejected with the error python-docx gives for the same text
+    if INVALID_XML_CHARACTERS.search(text):
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+    space = ' xml:space="preserve"' if len(text.strip()) < len(text) else ""
+    return f"<w:t{space}>{escape(text)}</w:t>"
+
+
+def run(text: str, properties: str = "") -> str:
+    properties = f"<w:rPr>{properties}</w:rPr>" if properties else ""
+    return f"<w:r>{properties}{run_content(text)}</w:r>"
+
+
+def paragraph(text: str = "", properties: str = "", run_properties: str = "") -> str:
+    # Mirrors document.add_paragraph(text), which adds no run at all for empty text
+    properties = f"<w:pPr>{properties}</w:pPr>" if properties else ""
+    runs = run(text, run_properties) if text else ""
+    if not properties and not runs:
+        return "<w:p/>"
+    return f"<w:p>{properties}{runs}</w:p>"
+
+
+class StreamingCurriculumVitae:
+    # Writes the same layout as CurriculumVitae straight into the .docx zip without building a python-docx tree
+    def __init__(self, name: str, experiences: list[Experience] = None, educations: list[Education] = None,
+                 projects: list[Project] = None):
+        self.name = name
+        self.experiences = experiences if experiences is not None else []
+        self.educations = educations if educations is not None else []
+        self.projects = projects if projects is not None else []
+        self.__template = get_template()
+
+    def __add_space__(self):
+        yield paragraph()
+
+    def __add_section_heading__(self, text: str):
+        yield paragraph(text, run_properties='<w:b/><w:sz w:val="24"/>')
+
+    def __entry_header__(self, title: str, subtitle: str, date_string: str) -> str:
+        runs = run(title.strip(), "<w:b/>")
+        if subtitle is not None:
+            runs += run(subtitle, "<w:i/>")
+        runs += f"<w:r><w:rPr><w:i/></w:rPr><w:tab/>{text_element(date_string)}</w:r>"
+        tabs = f'<w:tabs><w:tab w:pos="{self.__template.right_tab_twips}" w:val="right"/></w:tabs>'
+        return f"<w:p><w:pPr>{tabs}</w:pPr>{runs}</w:p>"
+
+    def __bullets__(self, description: str):
+        style = f'<w:pStyle w:val="{self.__template.bullet_style_id}"/>'
+        bullets = [bullet for bullet in description.split('•') if bullet != '']
+        for i, bullet in enumerate(bullets):
+            if i == len(bullets) - 1:
+                spacing = f'<w:spacing w:after="{self.__template.bullet_space_after_twips}"/>'
+                yield paragraph(bullet, style + spacing)
+            else:
+                yield paragraph(bullet, style)
+
+    def __entry__(self, kind: str, entry: InformationEntry, entry_paragraphs) -> str:
+        # The XML of an identical entry rendered with the same settings is reused as is
+        key = fragment_key(kind, entry, (RIGHT_TAB_INCHES, BULLET_POINT_STYLE, self.__template.right_tab_twips,
+                                         self.__template.bullet_style_id))
+        fragment = XML_FRAGMENTS.get(key)
+        if fragment is None:
+            fragment = "".join(entry_paragraphs(entry))
+            XML_FRAGMENTS.put(key, fragment)
+        return fragment
+
+    def __create_experiences__(self):
+        if len(self.experiences) == 0:
+            return
+        yield from self.__add_section_heading__("WORK EXPERIENCE")
+        for experience in self.experiences:
+            yield self.__entry__("experience", experience, self.__experience__)
+
+    def __experience__(self, experience: Experience):
+        date_string = (f"{experience.start_date.strip()} – "
+                       f"{'Present' if experience.end_date == '' else experience.end_date.strip()}")
+        yield self.__entry_header__(experience.title,
+                                    f" - {experience.company_name.strip()}, {experience.location.strip()}",
+                                    date_string)
+        yield from self.__bullets__(experience.description)
+
+    def __create_education__(self):
+        if len(self.educations) == 0:
+            return
+        yield from self.__add_section_heading__("EDUCATION")
+        for education in self.educations:
+            yield self.__entry__("education", education, self.__education__)
+
+    def __education__(self, education: Education):
+        style = f'<w:pStyle w:val="{self.__template.bullet_style_id}"/>'
+        date_string = f"{education.start_date.strip()} – {education.end_date.strip()}"
+        yield self.__entry_header__(education.title, f" - {education.location.strip()}", date_string)
+        yield paragraph(f"{education.degree.strip()}")
+        if len(education.extracurriculars) > 0:
+            yield paragraph("Extracurriculars", run_properties="<w:i/>")
+            for extracurricular in education.extracurriculars:
+                yield paragraph(extracurricular.strip(), style)
+
+    def __create_projects__(self):
+        if len(self.projects) == 0:
+            return
+        yield from self.__add_section_heading__("PROJECTS")
+        for project in self.projects:
+            yield self.__entry__("project", project, self.__project__)
+
+    def __project__(self, project: Project):
+        date_string = (f"{project.start_date.strip()} – "
+                       f"{'Present' if project.end_date == '' else project.end_date.strip()}")
+        yield self.__entry_header__(project.title, None, date_string)
+        yield from self.__bullets__(project.description)
+
+    def body(self):
+        # Paragraphs in the same order CurriculumVitae adds them
+        yield from self.__add_space__()
+        yield from self.__create_education__()
+        yield from self.__add_space__()
+        yield from self.__create_projects__()
+        yield from self.__add_space__()
+        yield from self.__create_experiences__()
+
+    def save(self, path):
+        # path may also be a seekable binary file object
+        with METRICS.timer("cv_save"):
+            if isinstance(path, str):
+                with open(path, "w+b") as docx_file:
+                    self.__write__(docx_file)
+            else:
+                self.__write__(path)
+
+    def __write__(self, docx_file):
+        start = docx_file.tell()
+        docx_file.write(self.__template.static_zip)
+        docx_file.seek(start)
+        with zipfile.ZipFile(docx_file, "a", zipfile.ZIP_DEFLATED) as docx_zip:
+            header = self.__template.header_prefix + run_content(self.name) + self.__template.header_suffix
+            docx_zip.writestr(self.__template.header_part, header.encode("utf-8"))
+            with docx_zip.open(DOCUMENT_PART, "w") as document_stream:
+                document_stream.write(self.__template.document_prefix)
+                for xml in self.body():
+                    document_stream.write(xml.encode("utf-8"))
+                document_stream.write(self.__template.document_suffix)
@@ -0,0 +1,89 @@
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from linkedinObjects import LinkedinInstance, LinkedinProfile
+
+
+class JobSignals(QObject):
+    # QRunnable is not a QObject, so every job carries one of these to talk to the GUI thread
+    progress = pyqtSignal(str, str)
+    finished = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+
+
+class ScrapeJob(QRunnable):
+    def __init__(self, instance: LinkedinInstance, slug: str):
+        super().__init__()
+        self.instance = instance
+        self.slug = slug
+        self.signals = JobSignals()
+
+    def run(self):
+        profile = LinkedinProfile(self.slug)
+        self.instance.on_progress = self.signals.progress.emit
+        try:
+            self.instance.scrape_profile(profile)
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.failed.emit(self.slug, str(e))
+            return
+        self.signals.finished.emit(self.slug, profile)
+
+
+class RenderJob(QRunnable):
+    def __init__(self, profile: LinkedinProfile, save_path: str, streaming: bool = False):
+        super().__init__()
+        self.profile = profile
+        self.save_path = save_path
+        self.streaming = streaming
+        self.signals = JobSignals()
+
+    def run(self):
+        try:
+            self.profile.create_cv(self.streaming).save(self.save_path)
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.failed.emit(self.profile.slug, str(e))
+            return
+        self.signals.finished.emit(self.profile.slug, self.save_path)
+
+
+class JobQueue:
+    # Scrapes run one at a time because they share a single browser. CVs are written on the shared pool's threads,
+    # which keeps the window responsive but does not use more cores since they share the GIL
+    def __init__(self, instance: LinkedinInstance):
+        self.instance = instance
+        self.scrape_pool = QThreadPool()
+        self.scrape_pool.setMaxThreadCount(1)
+        self.render_pool = QThreadPool.globalInstance()
+        # Jobs are kept alive until their last signal has been delivered
+        self.jobs = set()
+
+    def __track__(self, job):
+        self.jobs.add(job)
+        job.signals.finished.connect(lambda *_: self.jobs.discard(job))
+        job.signals.failed.connect(lambda *_: self.jobs.discard(job))
+
+    def scrape(self, slug: str, on_progress, on_finished, on_failed) -> ScrapeJob:
+        job = ScrapeJob(self.instance, slug)
+        job.signals.progress.connect(on_progress)
+        job.signals.finished.connect(on_finished)
+        job.signals.failed.connect(on_failed)
+        self.__track__(job)
+        self.scrape_pool.start(job)
+        return job
+
+    def render(self, profile: LinkedinProfile, save_path: str, on_finished, on_failed) -> RenderJob:
+        job = RenderJob(profile, save_path)
+        job.signals.finished.connect(on_finished)
+        job.signals.failed.connect(on_failed)
+        self.__track__(job)
+        self.render_pool.start(job)
+        return job
+
+    def shutdown(self):
+        # Drop queued scrapes and let the running one finish before the browser is closed
+        self.scrape_pool.clear()
+        self.scrape_pool.waitForDone()
+        self.render_pool.waitForDone()